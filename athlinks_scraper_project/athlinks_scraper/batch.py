@@ -0,0 +1,75 @@
+import sys
+
+from .core import extract_event_id, extract_master_id, fetch_master_events
+from .catalog import load_master_events
+
+def read_batch_lines(path):
+    """
+    Reads batch input from a file, or from stdin if path is '-'.
+    Blank lines and lines starting with '#' are skipped.
+    """
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+def resolve_target(text):
+    """
+    Classifies one batch line as ('event', id) or ('master', id), the same way
+    the CLI treats its url argument. Returns None if it can't be resolved.
+    """
+    event_id = extract_event_id(text)
+    if event_id:
+        return ('event', event_id)
+    master_id = extract_master_id(text)
+    if master_id:
+        return ('master', master_id)
+    if text.isdigit():
+        return ('event', text)
+    return None
+
+def resolve_batch(lines, all_years=False, catalog=None, manifest=None):
+    """
+    Turns batch lines into a deduplicated list of events to scrape.
+    Master IDs expand to their latest child event, or every child event with
+    all_years=True. Events are returned as dicts with 'id', 'name' and
+    'date_str', in the order they were first seen. Lines that couldn't be
+    resolved are returned separately. With all_years, masters are resolved
+    through the catalog (see catalog.load_master_events).
+    """
+    targets = []
+    unresolved = []
+    for line in lines:
+        target = resolve_target(line)
+        if target is None:
+            unresolved.append(line)
+        elif target not in targets:
+            targets.append(target)
+
+    events = []
+    seen = set()
+
+    def add(event):
+        event_id = str(event['id'])
+        if event_id not in seen:
+            seen.add(event_id)
+            events.append(event)
+
+    for kind, item_id in targets:
+        if kind == 'event':
+            add({'id': item_id, 'name': f"Event {item_id}", 'date_str': 'Unknown'})
+            continue
+
+        if all_years:
+            children = load_master_events(item_id, catalog=catalog, manifest=manifest)
+        else:
+            children = fetch_master_events(item_id)
+        if not children:
+            print(f"No events found for Master ID {item_id}.")
+            continue
+        for event in (children if all_years else children[:1]):
+            add(event)
+
+    return events, unresolved
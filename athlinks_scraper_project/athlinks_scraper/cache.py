@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+import requests
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "athlinks-scraper")
+
+# Seconds a cached response stays fresh, by endpoint. Results of a race in
+# progress change quickly; master event listings only gain a new year now and then.
+DEFAULT_TTLS = {
+    "master": 6 * 3600,
+    "metadata": 24 * 3600,
+    "results": 15 * 60,
+}
+
+_ENDPOINT_PATTERNS = [
+    ("master", re.compile(r'^/master/[^/]+/metadata$')),
+    ("metadata", re.compile(r'^/event/[^/]+/metadata$')),
+    ("results", re.compile(r'^/event/[^/]+/results$')),
+]
+
+class OfflineCacheMiss(requests.exceptions.RequestException):
+    """
+    Raised in offline mode when a response is not in the cache.
+    """
+
+def endpoint_for(path):
+    """
+    Maps an API path to its endpoint name ('master', 'metadata', 'results'), or None.
+    """
+    for name, pattern in _ENDPOINT_PATTERNS:
+        if pattern.match(path):
+            return name
+    return None
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of raw API response bodies.
+    Entries are keyed by a hash of the URL and query params and stored as
+    {root}/{key[:2]}/{key}; the file's mtime is its fetch time.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, ttls=None, offline=False):
+        self.root = root
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.offline = offline
+
+    def key(self, url, params=None):
+        canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def ttl_for(self, path):
+        return self.ttls.get(endpoint_for(path), 0)
+
+    def get(self, url, params=None, ttl=None):
+        """
+        Returns the cached body if present and younger than ttl seconds
+        (any age when ttl is None or in offline mode), else None.
+        """
+        path = self._path(self.key(url, params))
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if not self.offline and ttl is not None and age > ttl:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, url, params, body):
+        path = self._path(self.key(url, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so concurrent readers never see a partial body.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
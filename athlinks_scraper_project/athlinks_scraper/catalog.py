@@ -0,0 +1,147 @@
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import DEFAULT_TTLS
+from .core import PAGE_LIMIT, MAX_PAGE_WORKERS, fetch_master_events, fetch_metadata, is_event_final
+
+CATALOG_NAME = "catalog.json"
+
+def describe_courses(metadata):
+    """
+    Summarises the courses listed in event metadata as dicts with
+    'id', 'name' and 'distance_meters'.
+    """
+    return [{
+        'id': course.get('id'),
+        'name': course.get('name'),
+        'distance_meters': (course.get('distance') or {}).get('meters'),
+    } for course in (metadata or {}).get('courses') or []]
+
+# The event metadata has no result counts, so sizes are only known from the
+# rows an earlier scrape saved (see manifest.ScrapeManifest).
+
+def expected_results(manifest_entry):
+    """
+    Best guess at an event's result count: the rows saved by an earlier
+    scrape, else None.
+    """
+    if manifest_entry and manifest_entry.get('rows') is not None:
+        return int(manifest_entry['rows'])
+    return None
+
+def expected_pages(manifest_entry, limit=PAGE_LIMIT):
+    """
+    Best guess at how many result pages an event has, from the rows saved by
+    an earlier scrape, else None. The results API pages each course interval
+    separately, so with several of them this is an upper bound.
+    """
+    rows = expected_results(manifest_entry)
+    return math.ceil(rows / limit) if rows is not None else None
+
+def _add_estimates(event, manifest):
+    manifest_entry = manifest.get(event['id']) if manifest is not None else None
+    event['expected_results'] = expected_results(manifest_entry)
+    event['expected_pages'] = expected_pages(manifest_entry)
+
+def resolve_master(master_id, client=None, max_workers=MAX_PAGE_WORKERS, manifest=None):
+    """
+    Lists a master event's child events with their metadata, fetched concurrently.
+    Each event dict from fetch_master_events gains 'courses', 'final', the
+    raw 'metadata' (so scraping doesn't have to fetch it again) and, from the
+    rows a manifest recorded last time, 'expected_results' and
+    'expected_pages' (None without a manifest entry).
+    """
+    events = fetch_master_events(master_id, client=client)
+    if not events:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        metadatas = list(pool.map(lambda e: fetch_metadata(e['id'], client=client), events))
+
+    for event, metadata in zip(events, metadatas):
+        event['metadata'] = metadata
+        event['courses'] = describe_courses(metadata)
+        event['final'] = is_event_final(metadata)
+        _add_estimates(event, manifest)
+    return events
+
+def plan_largest_first(events):
+    """
+    Orders events by expected result count, largest first, so the longest
+    scrapes start early instead of trailing behind everything else. Events
+    with no estimate go last, keeping their original order.
+    """
+    return sorted(events, key=lambda e: (e.get('expected_results') is None, -(e.get('expected_results') or 0)))
+
+class EventCatalog:
+    """
+    Local catalog of resolved master events, kept next to the output files.
+    Each entry holds a master's child events, including their metadata, and
+    when they were resolved, so plans can be made and events scraped without
+    fetching any of it again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.masters = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.masters = json.load(f).get('masters', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable catalog {path}: {e}")
+
+    @classmethod
+    def for_directory(cls, directory):
+        return cls(os.path.join(directory, CATALOG_NAME))
+
+    def get(self, master_id, max_age=DEFAULT_TTLS["master"]):
+        """
+        Returns the cataloged events of a master event, or None if it isn't
+        cataloged or was resolved more than max_age seconds ago.
+        """
+        entry = self.masters.get(str(master_id))
+        if not entry or time.time() - entry.get('resolved_at', 0) > max_age:
+            return None
+        return entry['events']
+
+    def update(self, master_id, events):
+        """
+        Stores freshly resolved events for a master event and saves the catalog.
+        """
+        with self.lock:
+            self.masters[str(master_id)] = {'resolved_at': time.time(), 'events': [dict(e) for e in events]}
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".catalog-")
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'masters': self.masters}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+def load_master_events(master_id, catalog=None, client=None, max_workers=MAX_PAGE_WORKERS, manifest=None):
+    """
+    Returns a master event's resolved child events, from the catalog if it
+    has a fresh entry, otherwise via resolve_master (updating the catalog).
+    The size estimates follow the manifest as it is now either way.
+    """
+    if catalog is not None:
+        events = catalog.get(master_id)
+        if events is not None:
+            events = [dict(e) for e in events]
+            for event in events:
+                _add_estimates(event, manifest)
+            return events
+
+    events = resolve_master(master_id, client=client, max_workers=max_workers, manifest=manifest)
+    if catalog is not None and events:
+        catalog.update(master_id, events)
+    return events
@@ -0,0 +1,192 @@
+import json
+import os
+import shutil
+import tempfile
+
+import pyarrow as pa
+
+from .core import PAGE_LIMIT
+
+class ScrapeCheckpoint:
+    """
+    Progress of one event's scrape, kept in {root}/{event_id}/ so an
+    interrupted fetch can resume where it stopped.
+    state.json records the next offset to fetch; every completed page is
+    saved as an Arrow IPC file named by its offset.
+    """
+
+    def __init__(self, root, event_id, limit=PAGE_LIMIT):
+        self.dir = os.path.join(root, str(event_id))
+        self.event_id = str(event_id)
+        self.limit = limit
+        self.next_offset = 0
+        self.pages = []
+
+    @property
+    def state_path(self):
+        return os.path.join(self.dir, "state.json")
+
+    def load(self):
+        """
+        Loads saved progress. Returns the offset to resume from (0 if there is
+        nothing usable, e.g. it was written with a different page size).
+        """
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        pages = state.get('pages', [])
+        if state.get('limit') != self.limit or not all(os.path.exists(self._page_path(o)) for o in pages):
+            self.clear()
+            return 0
+
+        self.next_offset = state.get('next_offset', 0)
+        self.pages = pages
+        return self.next_offset
+
+    def _page_path(self, offset):
+        return os.path.join(self.dir, f"{offset:09d}.arrow")
+
+    def iter_batches(self):
+        """
+        Yields the saved RecordBatches in page order.
+        """
+        for offset in self.pages:
+            with pa.memory_map(self._page_path(offset), 'r') as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield reader.get_batch(i)
+
+    def save_page(self, offset, batch):
+        """
+        Persists the batch for the page at `offset` and advances the checkpoint past it.
+        """
+        os.makedirs(self.dir, exist_ok=True)
+        with pa.OSFile(self._page_path(offset), 'wb') as sink:
+            with pa.ipc.new_file(sink, batch.schema) as writer:
+                writer.write_batch(batch)
+
+        self.pages.append(offset)
+        self.next_offset = offset + self.limit
+        self._save_state()
+
+    def _save_state(self):
+        state = {
+            'event_id': self.event_id,
+            'limit': self.limit,
+            'next_offset': self.next_offset,
+            'pages': self.pages,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, prefix=".state-")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def clear(self):
+        """
+        Deletes the checkpoint, e.g. once the output file is complete.
+        """
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.next_offset = 0
+        self.pages = []
+
+class PageStore:
+    """
+    Parsed pages of one event together with the SHA-256 of each page's raw
+    API response, kept in {root}/{event_id}/ between refreshes so that only
+    pages whose content changed need to be parsed and stored again.
+    """
+
+    def __init__(self, root, event_id, limit=PAGE_LIMIT):
+        self.dir = os.path.join(root, str(event_id))
+        self.event_id = str(event_id)
+        self.limit = limit
+        self.pages = {}  # offset -> {'sha256': ..., 'rows': ...}
+
+    @property
+    def state_path(self):
+        return os.path.join(self.dir, "pages.json")
+
+    def load(self):
+        """
+        Loads the stored page hashes. Returns the number of pages stored
+        (0 if there is nothing usable).
+        """
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        pages = {int(offset): page for offset, page in state.get('pages', {}).items()}
+        if state.get('limit') != self.limit or not all(os.path.exists(self._page_path(o)) for o in pages):
+            self.clear()
+            return 0
+
+        self.pages = pages
+        return len(pages)
+
+    def _page_path(self, offset):
+        return os.path.join(self.dir, f"{offset:09d}.arrow")
+
+    def digest(self, offset):
+        return (self.pages.get(offset) or {}).get('sha256')
+
+    @property
+    def rows(self):
+        return sum(page['rows'] for page in self.pages.values())
+
+    def save_page(self, offset, digest, batch):
+        """
+        Stores the parsed batch for the page at `offset` and its response hash.
+        Call save() afterwards to persist the index.
+        """
+        os.makedirs(self.dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, prefix=".page-")
+        os.close(fd)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, batch.schema) as writer:
+                writer.write_batch(batch)
+        os.replace(tmp_path, self._page_path(offset))
+        self.pages[offset] = {'sha256': digest, 'rows': batch.num_rows}
+
+    def truncate(self, end):
+        """
+        Drops stored pages at or beyond offset `end` (the event got shorter).
+        Returns the number of pages dropped.
+        """
+        stale = [offset for offset in self.pages if offset >= end]
+        for offset in stale:
+            del self.pages[offset]
+            if os.path.exists(self._page_path(offset)):
+                os.remove(self._page_path(offset))
+        return len(stale)
+
+    def iter_batches(self, offsets=None):
+        """
+        Yields the stored RecordBatches in page order, of every page or just
+        of the given offsets.
+        """
+        for offset in sorted(self.pages if offsets is None else offsets):
+            with pa.memory_map(self._page_path(offset), 'r') as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield reader.get_batch(i)
+
+    def save(self):
+        state = {
+            'event_id': self.event_id,
+            'limit': self.limit,
+            'pages': {str(offset): page for offset, page in sorted(self.pages.items())},
+        }
+        os.makedirs(self.dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, prefix=".pages-")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def clear(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.pages = {}
@@ -2,7 +2,24 @@ import argparse
 import sys
 import os
 import re
-from .core import get_results, extract_event_id, extract_master_id, fetch_master_events
+from .core import extract_event_id, extract_master_id, fetch_master_events, fetch_metadata, configure_client
+from .core import describe_event
+from .core import API_BASE, DEFAULT_MAX_RETRIES, DEFAULT_RATE_LIMIT, DEFAULT_MAX_CONCURRENCY
+from .jobs import run_events
+from .cache import ResponseCache, DEFAULT_CACHE_DIR
+from .manifest import ScrapeManifest
+from .writers import FORMATS, format_for_path, page_parts, partition_path, refresh_event, write_event
+from .checkpoint import PageStore, ScrapeCheckpoint
+from .batch import read_batch_lines, resolve_batch
+from .catalog import EventCatalog, expected_pages, load_master_events, plan_largest_first
+from .metrics import enable_metrics, stage
+from .watch import main as watch_main
+from .tail import main as tail_main
+
+SUBCOMMANDS = {
+    "watch": watch_main,
+    "tail": tail_main,
+}
 
 def sanitize_filename(name):
     """
@@ -14,86 +31,206 @@ def sanitize_filename(name):
     name = name.replace(' ', '_')
     return name
 
-def process_event(event_id, output_dir=None, output_file=None):
+def process_event(event_id, output_dir=None, output_file=None, manifest=None, fmt=None,
+                  checkpoint_dir=None, resume=False, metadata=None, partitioned=False, pages_dir=None):
     """
     Helper to scrape a single event and save it.
+    Each page of results is appended to the output file as it arrives and,
+    if checkpoint_dir is given, checkpointed there so resume=True can pick
+    up an interrupted scrape. If a manifest is given, the saved file is recorded in it,
+    and the rows it recorded last time bound the read-ahead.
+    Pass metadata if it has already been fetched. With partitioned=True the
+    file goes into a Hive-partitioned Parquet dataset under output_dir.
+    With pages_dir, the event is refreshed instead: only pages whose content
+    changed since the last refresh are parsed, and the file is rewritten only
+    if any did. Partitioned, each page is its own part file and only the
+    changed ones are written (see writers.refresh_event).
+    Returns the number of rows saved.
     """
     print(f"Scraping results for Event ID: {event_id}")
-    df = get_results(event_id)
-    
-    if df.empty:
-        print(f"No results found for Event ID: {event_id}")
-        return
+    fmt = fmt or format_for_path(output_file)
+    metadata = metadata or fetch_metadata(event_id)
+    specific_event_id, event_name, event_date = describe_event(metadata)
 
     # Determine output path
     if output_file:
         output_path = output_file
+    elif partitioned:
+        fmt = "parquet"
+        output_path = partition_path(output_dir, metadata.get('masterId'), event_date, specific_event_id or event_id)
     elif output_dir:
         # Generate filename from Event Name and ID
-        event_name = df.iloc[0].get("Event Name", "Unknown_Event")
-        specific_event_id = df.iloc[0].get("Event ID", "Unknown_ID")
-        safe_name = sanitize_filename(f"{event_name}_{specific_event_id}")
-        filename = f"{safe_name}.csv"
+        safe_name = sanitize_filename(f"{event_name or 'Unknown_Event'}_{specific_event_id or event_id}")
+        filename = f"{safe_name}.{fmt}"
         
         # Create directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, filename)
     else:
-        output_path = "results.csv"
+        output_path = f"results.{fmt}"
 
-    df.to_csv(output_path, index=False)
-    print(f"Successfully saved {len(df)} rows to {output_path}")
+    if pages_dir:
+        with stage("event", event_id=str(event_id)) as info:
+            rows, changed = refresh_event(event_id, output_path, fmt, PageStore(pages_dir, event_id), metadata,
+                                          partitioned=partitioned)
+            info["rows"] = rows
+        if rows and not changed:
+            return rows
+    else:
+        checkpoint = ScrapeCheckpoint(checkpoint_dir, event_id) if checkpoint_dir else None
+        with stage("event", event_id=str(event_id)) as info:
+            pages = expected_pages(manifest.get(event_id)) if manifest is not None else None
+            rows = write_event(event_id, output_path, fmt, metadata, checkpoint=checkpoint, resume=resume,
+                               expected_pages=pages)
+            info["rows"] = rows
+    if rows == 0:
+        print(f"No results found for Event ID: {event_id}")
+        return 0
+
+    parts = page_parts(output_path) if partitioned and pages_dir else None
+    print(f"Successfully saved {rows} rows to {output_path if not parts else os.path.dirname(output_path)}")
+    if manifest is not None:
+        manifest.record(event_id, output_path, rows, event_date=event_date or None, parts=parts,
+                        master_id=metadata.get('masterId'))
+    return rows
 
 def main():
-    parser = argparse.ArgumentParser(description="Scrape Athlinks race results to CSV.")
-    parser.add_argument("url", help="The Athlinks event URL or Event ID.")
-    parser.add_argument("--output", "-o", help="Output CSV filename.")
+    # `athlinks-scraper watch ...` / `athlinks-scraper tail ...` run the long-lived modes instead.
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description="Scrape Athlinks race results to CSV, Parquet or NDJSON.")
+    parser.add_argument("url", nargs="?", help="The Athlinks event URL or Event ID.")
+    parser.add_argument("--batch", "-b", metavar="FILE", help="Scrape every event URL, master event URL or ID listed in FILE (one per line, '-' for stdin) in one run.")
+    parser.add_argument("--output", "-o", help="Output filename.")
+    parser.add_argument("--format", "-f", choices=FORMATS, help="Output format (default: from --output's extension, else csv).")
     parser.add_argument("--output-dir", "-d", help="Output directory. Filename will be auto-generated from Event Name.")
+    parser.add_argument("--partitioned", action="store_true", help="Write Parquet into a Hive-partitioned dataset under --output-dir (master_id=.../year=.../part-EVENT.parquet).")
     parser.add_argument("--all-years", action="store_true", help="If a Master Event URL is provided, scrape all past years.")
+    parser.add_argument("--incremental", action="store_true", help="With --all-years, skip events already saved in the output directory whose results are final.")
+    parser.add_argument("--resume", action="store_true", help="Checkpoint every page, and continue interrupted scrapes from their checkpoints instead of starting over.")
+    parser.add_argument("--refresh", action="store_true", help="Race-day refresh: re-fetch every page but re-parse and rewrite only when page contents changed since the last --refresh.")
+    parser.add_argument("--checkpoint-dir", help="Checkpoint every page into this directory (default with --resume: .checkpoints in the output directory).")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of events to scrape concurrently with --all-years or --batch.")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help="Maximum API requests per second, shared by all jobs.")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Upper bound for the self-tuning number of API requests in flight (0 turns the tuning off).")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory for cached API responses.")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from the API; don't read or write the response cache.")
+    parser.add_argument("--offline", action="store_true", help="Serve every request from the response cache; never touch the network.")
+    parser.add_argument("--api-base", default=API_BASE, help="Base URL of the results API (e.g. a local mock_api server).")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request read timeout in seconds.")
+    parser.add_argument("--retries", type=int, default=DEFAULT_MAX_RETRIES, help="Retries for throttled, failed or timed-out requests.")
+    parser.add_argument("--metrics", metavar="PATH", help="Write a JSON-lines trace of every request and stage to PATH, and Prometheus metrics next to it (.prom).")
     
     args = parser.parse_args()
+    if bool(args.url) == bool(args.batch):
+        parser.error("give either a url or --batch FILE.")
+    if args.batch and args.output:
+        parser.error("--batch saves one file per event; use --output-dir instead of --output.")
+    if args.offline and args.no_cache:
+        parser.error("--offline needs the response cache; drop --no-cache.")
+    if args.batch and not args.output_dir:
+        args.output_dir = "."
+    if args.partitioned and (args.output or not args.output_dir):
+        parser.error("--partitioned writes a dataset under --output-dir; don't combine it with --output.")
+    if args.partitioned and args.format not in (None, "parquet"):
+        parser.error("--partitioned datasets are always Parquet.")
+    # A refresh is pointless against cached results pages, so those are always re-fetched.
+    ttls = {"results": 0} if args.refresh else None
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, ttls=ttls, offline=args.offline)
+    configure_client(base_url=args.api_base, timeout=(5, args.timeout), max_retries=args.retries, rate_limit=args.rate_limit, cache=cache, max_concurrency=args.max_concurrency or None)
+    # Saved files are tracked in the output directory's manifest for --incremental re-runs.
+    manifest = ScrapeManifest.for_directory(args.output_dir) if args.output_dir else None
+    catalog = EventCatalog.for_directory(args.output_dir) if args.output_dir else None
+    fmt = args.format or format_for_path(args.output)
+    # Checkpointing writes every page twice, so it is only done when asked for.
+    checkpoint_dir = args.checkpoint_dir or (os.path.join(args.output_dir or ".", ".checkpoints") if args.resume else None)
+    pages_dir = os.path.join(args.output_dir or ".", ".pages") if args.refresh else None
+    metrics = enable_metrics() if args.metrics else None
     
+    def scrape_events(events):
+        if args.incremental and manifest is not None:
+            total = len(events)
+            events = [e for e in events if manifest.needs_scrape(e['id'])]
+            print(f"Skipping {total - len(events)} events already up to date in {args.output_dir}.")
+        print(f"Found {len(events)} events. Scraping with {args.jobs} job(s)...")
+        # Start the biggest events first so they don't end up running alone at the end.
+        events = plan_largest_first(events)
+
+        def scrape(event):
+            print(f"Processing {event['name']} ({event['date_str']})...")
+            return process_event(event['id'], args.output_dir, args.output, manifest, fmt, checkpoint_dir, args.resume,
+                                 metadata=event.get('metadata'), partitioned=args.partitioned, pages_dir=pages_dir)
+
+        def on_done(event, rows, error):
+            if error is not None:
+                print(f"Failed to scrape event {event['id']}: {error}")
+
+        report = run_events(events, scrape, jobs=args.jobs, on_done=on_done)
+        print(report.summary())
+        return report
+
     try:
+        # 0. Batch input: every line is resolved up front and scraped by one worker pool.
+        if args.batch:
+            events, unresolved = resolve_batch(read_batch_lines(args.batch), all_years=args.all_years,
+                                               catalog=catalog, manifest=manifest)
+            for line in unresolved:
+                print(f"Could not determine Event ID from: {line}")
+            report = scrape_events(events)
+            if report.failed or unresolved:
+                sys.exit(1)
+            return
+
         # 1. Check if it's a specific event URL
         specific_id = extract_event_id(args.url)
         if specific_id:
-            process_event(specific_id, args.output_dir, args.output)
+            process_event(specific_id, args.output_dir, args.output, manifest, fmt, checkpoint_dir, args.resume, partitioned=args.partitioned, pages_dir=pages_dir)
             return
 
         # 2. Check if it's a master event URL
         master_id = extract_master_id(args.url)
         if master_id:
             print(f"Detected Master Event ID: {master_id}")
-            events = fetch_master_events(master_id)
+            if args.all_years:
+                events = load_master_events(master_id, catalog=catalog, manifest=manifest)
+            else:
+                events = fetch_master_events(master_id)
             
             if not events:
                 print("No events found for this Master ID.")
                 return
 
             if args.all_years:
-                print(f"Found {len(events)} events. Scraping all years...")
-                for event in events:
-                    print(f"Processing {event['name']} ({event['date_str']})...")
-                    try:
-                        process_event(event['id'], args.output_dir, args.output)
-                    except Exception as e:
-                        print(f"Failed to scrape event {event['id']}: {e}")
+                scrape_events(events)
             else:
                 # Default: Scrape the latest event
                 latest_event = events[0]
                 print(f"Found {len(events)} events. Scraping latest: {latest_event['name']} ({latest_event['date_str']})")
-                process_event(latest_event['id'], args.output_dir, args.output)
+                process_event(latest_event['id'], args.output_dir, args.output, manifest, fmt, checkpoint_dir, args.resume, partitioned=args.partitioned, pages_dir=pages_dir)
             return
 
         # 3. Fallback: Try to use the input as an ID directly
         if args.url.isdigit():
-             process_event(args.url, args.output_dir, args.output)
+             process_event(args.url, args.output_dir, args.output, manifest, fmt, checkpoint_dir, args.resume, partitioned=args.partitioned, pages_dir=pages_dir)
         else:
             print("Could not determine Event ID from URL.")
             
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        if metrics is not None:
+            write_metrics(metrics, args.metrics)
+
+def write_metrics(metrics, path):
+    """
+    Saves the JSON-lines trace to path and the Prometheus textfile beside it.
+    """
+    prom_path = os.path.splitext(path)[0] + ".prom"
+    metrics.write_trace(path)
+    metrics.write_prometheus(prom_path)
+    print(f"Metrics written to {path} and {prom_path}")
 
 if __name__ == "__main__":
     main()
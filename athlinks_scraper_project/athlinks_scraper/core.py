@@ -1,8 +1,333 @@
 import requests
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import re
-from datetime import datetime
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import urlparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from .cache import OfflineCacheMiss, endpoint_for
+from .metrics import record, record_http, set_gauge, stage
+from .decoding import decode_json, decode_results_page
+
+API_BASE = "https://reignite-api.athlinks.com"
+
+# Results are paged with from/limit; pages beyond the first are fetched concurrently.
+PAGE_LIMIT = 100
+MAX_PAGE_WORKERS = 8
+
+# (connect, read) timeouts in seconds, and the retry policy for transient failures.
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Requests per second across all threads sharing a client (None = unlimited).
+DEFAULT_RATE_LIMIT = 10
+
+# Bounds of the adaptive limit on in-flight requests (see AdaptiveConcurrency).
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 32
+# Recent p90 latency above this multiple of the best p90 seen is treated as congestion.
+LATENCY_TOLERANCE = 2.0
+# Longest Retry-After (seconds) we will wait for.
+MAX_RETRY_AFTER = 300
+
+# Results of events that started more than this many days ago are treated as
+# final, so cached pages for them never expire.
+IMMUTABLE_AFTER_DAYS = 30
+
+class RateLimiter:
+    """
+    Thread-safe token bucket. acquire() blocks until a request may be sent.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on in-flight requests, shared by all threads using a client.
+    While requests are using the whole limit it grows by one per limit's
+    worth of successful responses. It is halved on a throttle (429), server
+    error or timeout, and cut by a quarter when the p90 latency of the last
+    `window` responses rises past `tolerance` times the best p90 seen. That
+    baseline may creep up by 5% per `window` responses, so an API that is
+    permanently slower isn't treated as congested forever.
+    Responses to requests sent before the last cut don't cut it again, so a
+    burst of 429s counts as one signal. pause() holds back every new request,
+    e.g. for a Retry-After.
+    """
+
+    def __init__(self, initial=DEFAULT_INITIAL_CONCURRENCY, min_limit=1, max_limit=DEFAULT_MAX_CONCURRENCY,
+                 window=20, tolerance=LATENCY_TOLERANCE):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.p90 = None
+        self.baseline = None
+        self.since_baseline = 0  # responses since the baseline was last updated
+        self.last_decrease = 0.0
+        self.paused_until = 0.0
+        self.decreases = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait > 0:
+                    self.cond.wait(wait)
+                elif self.in_flight < int(self.limit):
+                    break
+                else:
+                    self.cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency, outcome="ok"):
+        """
+        Returns a slot. outcome is 'ok', 'throttled' (429) or 'error' (5xx, timeout, connection error).
+        """
+        with self.cond:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            sent_at = time.monotonic() - latency
+            if outcome != "ok":
+                self._decrease(0.5, sent_at, outcome)
+            else:
+                self.latencies.append(latency)
+                self.since_baseline += 1
+                if len(self.latencies) == self.latencies.maxlen:
+                    self.p90 = float(np.percentile(self.latencies, 90))
+                    # Once per full window of new responses, not per response.
+                    if self.since_baseline >= self.latencies.maxlen:
+                        self.baseline = self.p90 if self.baseline is None else min(self.p90, self.baseline * 1.05)
+                        self.since_baseline = 0
+                if self.p90 is not None and self.p90 > self.baseline * self.tolerance:
+                    self._decrease(0.75, sent_at, "latency")
+                elif saturated:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.cond.notify_all()
+            state = self.state()
+        set_gauge("athlinks_concurrency_limit", state['limit'])
+        set_gauge("athlinks_requests_in_flight", state['in_flight'])
+        if state['p90_seconds'] is not None:
+            set_gauge("athlinks_latency_p90_seconds", state['p90_seconds'])
+
+    def _decrease(self, factor, sent_at, reason):
+        if sent_at < self.last_decrease:
+            return
+        self.limit = max(self.min_limit, self.limit * factor)
+        self.last_decrease = time.monotonic()
+        self.latencies.clear()
+        self.since_baseline = 0
+        self.p90 = None
+        self.decreases += 1
+        record("concurrency", limit=int(self.limit), reason=reason)
+        set_gauge("athlinks_concurrency_decreases", self.decreases)
+
+    def pause(self, seconds):
+        """
+        Sends no new requests for the next `seconds` seconds.
+        """
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.cond.notify_all()
+        record("backoff", reason="retry-after", seconds=seconds)
+        set_gauge("athlinks_retry_after_seconds", seconds)
+
+    def state(self):
+        return {
+            'limit': int(self.limit),
+            'in_flight': self.in_flight,
+            'p90_seconds': self.p90,
+            'baseline_p90_seconds': self.baseline,
+            'paused_for': max(0.0, self.paused_until - time.monotonic()),
+            'decreases': self.decreases,
+        }
+
+def parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or an HTTP date),
+    capped at MAX_RETRY_AFTER. None if absent or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+class ApiClient:
+    """
+    HTTP client for the reignite API shared by all fetchers.
+    Keeps connections alive in a pool and retries 429/5xx responses,
+    connection errors and timeouts with jittered exponential backoff,
+    waiting at least as long as any Retry-After header asks.
+    All threads using the same client share one rate limit for the API host
+    and one AdaptiveConcurrency limit on requests in flight (max_concurrency=None disables it).
+    If a ResponseCache is given, fresh cached responses are served without a request.
+    """
+
+    def __init__(self, base_url=API_BASE, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF, pool_size=32,
+                 rate_limit=DEFAULT_RATE_LIMIT, cache=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.cache = cache
+        self.concurrency = AdaptiveConcurrency(max_limit=max_concurrency) if max_concurrency else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, max_concurrency or 0))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff_delay(self, attempt):
+        # "Full jitter": sleep a random amount up to the exponential cap.
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def _send(self, url, params):
+        if self.concurrency is None:
+            return self.session.get(url, params=params, timeout=self.timeout)
+
+        self.concurrency.acquire()
+        sent = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            if response.status_code == 429:
+                outcome = "throttled"
+            elif response.status_code < 500:
+                outcome = "ok"
+            return response
+        finally:
+            self.concurrency.release(time.perf_counter() - sent, outcome)
+
+    def get_json(self, path, params=None, immutable=False, decode=decode_json):
+        """
+        GETs an API path (e.g. '/event/123/metadata') and returns the decoded JSON.
+        immutable=True means the response can no longer change, so any cached
+        copy is used regardless of age. decode turns the raw body into Python
+        objects (see decoding.py).
+        Raises the last error once retries are exhausted.
+        """
+        url = f"{self.base_url}{path}"
+        endpoint = endpoint_for(path)
+        started = time.perf_counter()
+
+        if self.cache:
+            ttl = None if immutable else self.cache.ttl_for(path)
+            body = self.cache.get(url, params, ttl)
+            if body is not None:
+                record_http(endpoint=endpoint, path=path, params=params, status=200, bytes=len(body),
+                            retries=0, cache="hit", seconds=round(time.perf_counter() - started, 6))
+                return decode(body)
+            if self.cache.offline:
+                raise OfflineCacheMiss(f"Not in cache (offline mode): {url}")
+
+        attempt = 0
+        status = None
+        try:
+            while True:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                try:
+                    response = self._send(url, params)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    status = None
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff_delay(attempt)
+                else:
+                    status = response.status_code
+                    if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        if self.cache:
+                            self.cache.put(url, params, response.content)
+                        data = decode(response.content)
+                        record_http(endpoint=endpoint, path=path, params=params, status=status,
+                                    bytes=len(response.content), retries=attempt,
+                                    cache="miss" if self.cache else "off",
+                                    seconds=round(time.perf_counter() - started, 6))
+                        return data
+
+                    delay = self._backoff_delay(attempt)
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        # The server said when to come back; hold every thread off until then.
+                        delay = max(delay, retry_after)
+                        if self.concurrency:
+                            self.concurrency.pause(retry_after)
+
+                record("backoff", reason="retry", endpoint=endpoint, status=status, attempt=attempt, seconds=round(delay, 3))
+                time.sleep(delay)
+                attempt += 1
+        except Exception as e:
+            record_http(endpoint=endpoint, path=path, params=params, status=status, bytes=0, retries=attempt,
+                        cache="miss" if self.cache else "off", error=type(e).__name__,
+                        seconds=round(time.perf_counter() - started, 6))
+            raise
+
+    def close(self):
+        self.session.close()
+
+_client = None
+
+def get_client():
+    """
+    Returns the shared ApiClient, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        _client = ApiClient()
+    return _client
+
+def configure_client(**kwargs):
+    """
+    Replaces the shared ApiClient with one built from the given options
+    (timeout, max_retries, backoff, ...). Returns the new client.
+    """
+    global _client
+    if _client is not None:
+        _client.close()
+    _client = ApiClient(**kwargs)
+    return _client
 
 def extract_event_id(url):
     """
@@ -36,16 +361,14 @@ def extract_master_id(url):
         return match.group(1)
     return None
 
-def fetch_master_events(master_id):
+def fetch_master_events(master_id, client=None):
     """
     Fetches all child events for a given master event ID.
     Returns a list of event objects (id, name, date).
     """
-    url = f"https://reignite-api.athlinks.com/master/{master_id}/metadata"
+    client = client or get_client()
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        data = client.get_json(f"/master/{master_id}/metadata")
         
         events = []
         # The 'events' list in the JSON contains the child events
@@ -66,84 +389,193 @@ def fetch_master_events(master_id):
         print(f"Error fetching master events: {e}")
         return []
 
-def fetch_metadata(event_id):
+def is_event_final(metadata, days=IMMUTABLE_AFTER_DAYS):
+    """
+    True if the event started more than `days` days ago, so its results won't change.
+    """
+    epoch = ((metadata or {}).get('start') or {}).get('epoch')
+    if not epoch:
+        return False
+    return time.time() - epoch / 1000 > days * 86400
+
+def fetch_metadata(event_id, client=None):
     """
     Fetches event metadata (Name, Date, etc.)
     """
-    url = f"https://reignite-api.athlinks.com/event/{event_id}/metadata"
+    client = client or get_client()
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
+        return client.get_json(f"/event/{event_id}/metadata")
     except Exception as e:
         print(f"Warning: Could not fetch metadata: {e}")
         return {}
 
-def fetch_results(event_id):
+def _fetch_results_page(client, event_id, from_index, limit, immutable=False, digest=False):
+    """
+    Fetches a single page of results starting at from_index.
+    With digest=True, returns (data, sha256 hex digest of the raw response body).
+    """
+    params = {
+        "correlationId": "",
+        "from": from_index,
+        "limit": limit
+    }
+    decode = decode_results_page
+    if digest:
+        decode = lambda body: (decode_results_page(body), hashlib.sha256(body).hexdigest())
+    return client.get_json(f"/event/{event_id}/results", params=params, immutable=immutable, decode=decode)
+
+def count_page_results(data):
+    """
+    Counts the individual results contained in one page of raw data blocks.
+    """
+    count = 0
+    if isinstance(data, list):
+        for course in data:
+            if 'intervals' in course:
+                for interval in course['intervals']:
+                    if 'results' in interval:
+                        count += len(interval['results'])
+    return count
+
+def is_page_full(data, limit):
+    """
+    True if any course interval on the page has `limit` results. Each
+    interval is paged separately, so only then can the next page hold more.
+    """
+    if isinstance(data, list):
+        for course in data:
+            for interval in course.get('intervals') or []:
+                if len(interval.get('results') or []) >= limit:
+                    return True
+    return False
+
+def iter_result_pages(event_id, limit=PAGE_LIMIT, max_workers=MAX_PAGE_WORKERS, client=None, immutable=False,
+                      start=0, expected_pages=None):
+    """
+    Yields (data_blocks, result_count) for each page of results, in offset order.
+    Pages are requested ahead of the one being consumed, starting with a single
+    request and doubling the read-ahead window up to max_workers while pages
+    keep coming back full. Stops at the first page on which no interval is full.
+    With expected_pages (e.g. from catalog.expected_pages), pages past that
+    estimate aren't read ahead, only fetched one at a time if the estimate
+    turns out low, so the end of an event doesn't cost a window of requests.
+    A page that still fails after the client's retries raises, rather than
+    silently truncating the results.
+    immutable=True lets cached pages be reused regardless of age.
+    start is the offset of the first page to fetch (for resuming).
+    """
+    for data, count, _ in _iter_pages(event_id, limit, max_workers, client, immutable, start, digest=False,
+                                      expected_pages=expected_pages):
+        yield data, count
+
+def iter_hashed_result_pages(event_id, limit=PAGE_LIMIT, max_workers=MAX_PAGE_WORKERS, client=None,
+                             immutable=False, start=0, expected_pages=None):
+    """
+    Like iter_result_pages, but yields (data_blocks, result_count, digest),
+    where digest is the SHA-256 of the page's raw response body, so callers
+    can tell which pages changed since they last saw them.
+    """
+    return _iter_pages(event_id, limit, max_workers, client, immutable, start, digest=True,
+                       expected_pages=expected_pages)
+
+def _iter_pages(event_id, limit, max_workers, client, immutable, start, digest, expected_pages=None):
+    client = client or get_client()
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+    next_index = start
+    window = 1
+    # Offset just past the last expected page (pages are at absolute offsets).
+    end = expected_pages * limit if expected_pages is not None else None
+
+    def submit():
+        nonlocal next_index
+        pending.append(pool.submit(_fetch_results_page, client, event_id, next_index, limit, immutable, digest))
+        next_index += limit
+
+    try:
+        submit()
+        while pending:
+            # Time spent blocked here is fetch latency the read-ahead didn't hide.
+            with stage("fetch_wait", event_id=str(event_id)):
+                data = pending.popleft().result()
+            data, page_digest = data if digest else (data, None)
+            batch_results_count = count_page_results(data)
+            print(f"Fetched {batch_results_count} results")
+            yield data, batch_results_count, page_digest
+
+            # A page with no full interval is the last one; no need to ask for an empty page after it.
+            if not is_page_full(data, limit):
+                break
+
+            window = min(window * 2, max_workers)
+            while len(pending) < window and (end is None or next_index < end or not pending):
+                submit()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def fetch_results(event_id, limit=PAGE_LIMIT, max_workers=MAX_PAGE_WORKERS, client=None, immutable=False,
+                  expected_pages=None):
     """
     Fetches all results for the given event ID from the Athlinks API.
-    Handles pagination automatically.
+    Handles pagination automatically, fetching up to max_workers pages concurrently
+    (see iter_result_pages for expected_pages).
     Returns the raw list of course objects.
     """
-    base_url = f"https://reignite-api.athlinks.com/event/{event_id}/results"
-    # We need to store the raw course objects to preserve the structure
-    # But pagination might return partial course objects?
-    # Let's accumulate the 'intervals' -> 'results' into a structure we can parse later.
-    # Actually, to keep it simple, let's just return a flat list of enriched result dicts here?
-    # No, separation of concerns. Let's return the raw data blocks.
-    
-    # Issue: The API returns a list of courses. Pagination likely appends results to the 'results' list inside the intervals.
-    # If we just append the whole response objects, we might duplicate course metadata but that's fine.
-    # We will parse it all together.
-    
+    # The API returns a list of courses per page, each holding a slice of the
+    # 'intervals' -> 'results' lists. Course metadata is repeated on every page;
+    # parse_results flattens it all together, so just keep the raw blocks in order.
     all_data_blocks = []
-    limit = 100
-    from_index = 0
-    
+
     print(f"Fetching results for Event ID: {event_id}...")
-    
-    while True:
-        params = {
-            "correlationId": "",
-            "from": from_index,
-            "limit": limit
-        }
-        
-        try:
-            response = requests.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching data: {e}")
-            break
-            
-        batch_results_count = 0
-        
+
+    for data, _ in iter_result_pages(event_id, limit, max_workers, client, immutable, expected_pages=expected_pages):
         if isinstance(data, list):
             all_data_blocks.extend(data) # Store the raw blocks
-            for course in data:
-                if 'intervals' in course:
-                    for interval in course['intervals']:
-                        if 'results' in interval:
-                            batch_results_count += len(interval['results'])
-        
-        print(f"Fetched {batch_results_count} results")
-        
-        if batch_results_count == 0:
-            break
-            
-        from_index += limit
-        
+
     return all_data_blocks
 
-def parse_results(data_blocks, metadata=None):
+# Output columns, in order, and their Arrow types.
+RESULTS_SCHEMA = pa.schema([
+    ("Event ID", pa.int64()),
+    ("Event Name", pa.string()),
+    ("Event Date", pa.string()),
+    ("Race Type", pa.string()),
+    ("Name", pa.string()),
+    ("Gender", pa.string()),
+    ("Age", pa.int64()),
+    ("Bib", pa.string()),
+    ("City", pa.string()),
+    ("State", pa.string()),
+    ("Country", pa.string()),
+    ("Time", pa.string()),
+    ("Pace", pa.string()),
+    ("Overall Rank", pa.int64()),
+    ("Gender Rank", pa.int64()),
+    ("Division Rank", pa.int64()),
+    ("Status", pa.string()),
+    # Typed values behind Time, Pace and the course distance, for analytics.
+    ("time_ms", pa.int64()),
+    ("pace_seconds", pa.int64()),
+    ("distance_meters", pa.int64()),
+])
+RESULT_COLUMNS = RESULTS_SCHEMA.names
+
+def _to_int(value):
+    if value is None or type(value) is int:
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+def describe_event(metadata):
     """
-    Parses the list of raw data blocks into a flat list of dicts suitable for CSV.
-    Enriches with metadata if provided.
+    Returns (event_id, event_name, event_date) from event metadata.
     """
-    parsed_data = []
-    
-    # Extract Event Info
     event_name = metadata.get('name', '') if metadata else ''
     event_date = ''
     if metadata and 'start' in metadata and 'epoch' in metadata['start']:
@@ -152,77 +584,153 @@ def parse_results(data_blocks, metadata=None):
             event_date = dt.strftime('%Y-%m-%d')
         except:
             pass
-    
+
     event_id = metadata.get('id', '') if metadata else ''
+    return event_id, event_name, event_date
+
+_TWO_DIGITS = pa.array([f"{i:02d}" for i in range(60)])
+
+def _time_pace_columns(chip_millis, dist_meters):
+    """
+    Computes the time and pace columns for a whole batch in one vectorized pass:
+    NumPy for the arithmetic, Arrow compute kernels for the string formatting.
+    chip_millis: int64 array of chip times (0 = missing).
+    dist_meters: float64 array of interval distances (0 = missing).
+    Returns a dict of pyarrow arrays:
+      Time: "MM:SS" or "HH:MM:SS" (null when missing)
+      Pace: min/mi as "M:SS" ("" when it can't be computed)
+      time_ms, pace_seconds, distance_meters: the same values as integers (null when missing)
+    """
+    has_time = chip_millis > 0
+
+    seconds = np.where(has_time, chip_millis, 0) // 1000
+    minutes, secs = np.divmod(seconds, 60)
+    hours, minutes = np.divmod(minutes, 60)
+    mm_ss = pc.binary_join_element_wise(_TWO_DIGITS.take(minutes), _TWO_DIGITS.take(secs), ':')
+    hh = pc.utf8_lpad(pa.array(hours).cast(pa.string()), width=2, padding='0')
+    time = pc.if_else(pa.array(hours > 0), pc.binary_join_element_wise(hh, mm_ss, ':'), mm_ss)
+    time = pc.if_else(pa.array(has_time), time, pa.scalar(None, pa.string()))
+
+    has_pace = has_time & (dist_meters > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        time_min = chip_millis / 1000 / 60
+        dist_miles = dist_meters * 0.000621371
+        pace_min_per_mile = np.where(has_pace, time_min / dist_miles, 0.0)
+    p_min = pace_min_per_mile.astype(np.int64)
+    p_sec = ((pace_min_per_mile - p_min) * 60).astype(np.int64)
+    pace = pc.binary_join_element_wise(pa.array(p_min).cast(pa.string()), _TWO_DIGITS.take(p_sec), ':')
+    pace = pc.if_else(pa.array(has_pace), pace, "")
+
+    return {
+        "Time": time,
+        "Pace": pace,
+        "time_ms": pa.array(chip_millis, type=pa.int64(), mask=~has_time),
+        "pace_seconds": pa.array(p_min * 60 + p_sec, type=pa.int64(), mask=~has_pace),
+        "distance_meters": pa.array(np.rint(dist_meters).astype(np.int64), type=pa.int64(), mask=~(dist_meters > 0)),
+    }
+
+def _page_columns(data_blocks, event_info):
+    """
+    Flattens raw data blocks into a dict of columns (see RESULT_COLUMNS).
+    Per-result fields are gathered in one walk; the time and pace columns are
+    then derived for the whole batch at once.
+    """
+    event_id, event_name, event_date = event_info
+    columns = {name: [] for name in RESULT_COLUMNS}
+
+    race_types = columns["Race Type"]
+    names = columns["Name"]
+    genders = columns["Gender"]
+    ages = columns["Age"]
+    bibs = columns["Bib"]
+    cities = columns["City"]
+    states = columns["State"]
+    countries = columns["Country"]
+    chip_millis = []
+    distances = []
+    overall_ranks = columns["Overall Rank"]
+    gender_ranks = columns["Gender Rank"]
+    division_ranks = columns["Division Rank"]
+    statuses = columns["Status"]
 
     for course in data_blocks:
         race_obj = course.get('race') or {}
         race_type = race_obj.get('name', '')
-        
-        if 'intervals' in course:
-            for interval in course['intervals']:
-                dist_obj = interval.get('distance') or {}
-                dist_meters = dist_obj.get('meters')
-                if 'results' in interval:
-                    for r in interval['results']:
-                        # Calculate Pace
-                        pace_str = ""
-                        if r.get("chipTimeInMillis") and dist_meters:
-                            try:
-                                time_min = int(r["chipTimeInMillis"]) / 1000 / 60
-                                dist_miles = dist_meters * 0.000621371
-                                if dist_miles > 0:
-                                    pace_min_per_mile = time_min / dist_miles
-                                    p_min = int(pace_min_per_mile)
-                                    p_sec = int((pace_min_per_mile - p_min) * 60)
-                                    pace_str = f"{p_min}:{p_sec:02d}"
-                            except Exception:
-                                pass
-
-                        # Basic info
-                        location = r.get("location") or {}
-                        rankings = r.get("rankings") or {}
-                        
-                        entry = {
-                            "Event ID": event_id,
-                            "Event Name": event_name,
-                            "Event Date": event_date,
-                            "Race Type": race_type,
-                            "Name": r.get("displayName"),
-                            "Gender": r.get("gender"),
-                            "Age": r.get("age"),
-                            "Bib": r.get("bib"),
-                            "City": location.get("locality"),
-                            "State": location.get("region"),
-                            "Country": location.get("country"),
-                            "Time": r.get("chipTimeInMillis"), # Needs conversion
-                            "Pace": pace_str,
-                            "Overall Rank": rankings.get("overall"),
-                            "Gender Rank": rankings.get("gender"),
-                            "Division Rank": rankings.get("primary"),
-                            "Status": r.get("status"),
-                        }
-                        
-                        # Convert time from millis to readable string
-                        if entry["Time"]:
-                            seconds = int(entry["Time"]) // 1000
-                            m, s = divmod(seconds, 60)
-                            h, m = divmod(m, 60)
-                            entry["Time"] = f"{h:02d}:{m:02d}:{s:02d}" if h > 0 else f"{m:02d}:{s:02d}"
-                            
-                        parsed_data.append(entry)
-        
-    return parsed_data
+
+        for interval in course.get('intervals') or []:
+            dist_obj = interval.get('distance') or {}
+            dist_meters = dist_obj.get('meters')
+            results = interval.get('results') or []
+            race_types.extend([race_type] * len(results))
+            distances.extend([float(dist_meters or 0)] * len(results))
+
+            for r in results:
+                location = r.get("location") or {}
+                rankings = r.get("rankings") or {}
+
+                names.append(r.get("displayName"))
+                genders.append(r.get("gender"))
+                ages.append(_to_int(r.get("age")))
+                bibs.append(_to_str(r.get("bib")))
+                cities.append(location.get("locality"))
+                states.append(location.get("region"))
+                countries.append(location.get("country"))
+                chip_millis.append(_to_int(r.get("chipTimeInMillis")) or 0)
+                overall_ranks.append(_to_int(rankings.get("overall")))
+                gender_ranks.append(_to_int(rankings.get("gender")))
+                division_ranks.append(_to_int(rankings.get("primary")))
+                statuses.append(r.get("status"))
+
+    columns.update(_time_pace_columns(
+        np.array(chip_millis, dtype=np.int64), np.array(distances, dtype=np.float64)))
+
+    row_count = len(names)
+    columns["Event ID"] = [_to_int(event_id)] * row_count
+    columns["Event Name"] = [event_name] * row_count
+    columns["Event Date"] = [event_date] * row_count
+    return columns
+
+def parse_results_batch(data_blocks, metadata=None, event_info=None):
+    """
+    Parses raw data blocks (e.g. one page of results) into a pyarrow RecordBatch
+    with RESULTS_SCHEMA. Pass a precomputed event_info to skip re-reading metadata.
+    """
+    if event_info is None:
+        event_info = describe_event(metadata)
+    return pa.RecordBatch.from_pydict(_page_columns(data_blocks, event_info), schema=RESULTS_SCHEMA)
+
+def parse_results(data_blocks, metadata=None):
+    """
+    Parses the list of raw data blocks into a flat list of dicts suitable for CSV.
+    Enriches with metadata if provided.
+    """
+    return parse_results_batch(data_blocks, metadata).to_pylist()
+
+def iter_result_batches(event_id, metadata=None, client=None, immutable=False,
+                        limit=PAGE_LIMIT, max_workers=MAX_PAGE_WORKERS, start=0, expected_pages=None):
+    """
+    Fetches results page by page and yields one RecordBatch per page.
+    Each raw page is parsed as soon as it arrives and then released, so memory
+    is bounded by the page read-ahead rather than the size of the event.
+    """
+    event_info = describe_event(metadata)
+
+    print(f"Fetching results for Event ID: {event_id}...")
+
+    for data, _ in iter_result_pages(event_id, limit, max_workers, client, immutable, start, expected_pages):
+        with stage("parse", event_id=str(event_id)) as info:
+            batch = parse_results_batch(data if isinstance(data, list) else [], event_info=event_info)
+            info["rows"] = batch.num_rows
+        del data
+        yield batch
 
 def results_to_df(data_blocks, metadata=None):
     """
     Converts parsed results to a Pandas DataFrame.
     """
-    parsed = parse_results(data_blocks, metadata)
-    df = pd.DataFrame(parsed)
-    return df
+    return parse_results_batch(data_blocks, metadata).to_pandas()
 
-def get_results(url_or_id):
+def get_results(url_or_id, client=None):
     """
     Main entry point. Takes a URL or Event ID, fetches results, and returns a DataFrame.
     """
@@ -231,7 +739,7 @@ def get_results(url_or_id):
     else:
         event_id = extract_event_id(url_or_id)
         
-    metadata = fetch_metadata(event_id)
-    raw_data = fetch_results(event_id)
-    df = results_to_df(raw_data, metadata)
-    return df
+    metadata = fetch_metadata(event_id, client=client)
+    batches = iter_result_batches(event_id, metadata, client=client, immutable=is_event_final(metadata))
+    table = pa.Table.from_batches(list(batches), schema=RESULTS_SCHEMA)
+    return table.to_pandas(self_destruct=True)
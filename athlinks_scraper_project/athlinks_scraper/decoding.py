@@ -0,0 +1,84 @@
+"""
+JSON decoding for API responses.
+
+Uses msgspec or orjson when installed (`pip install athlinks-scraper[fast]`)
+and falls back to the standard library otherwise.
+"""
+import json
+from typing import Any, List, Optional, TypedDict
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def decode_json(body):
+    """
+    Decodes a JSON response body (bytes or str) into Python objects.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+# The parts of a results page that parse_results_batch reads. TypedDicts
+# decode to plain dicts, so parsing code is the same either way; any field
+# not listed here (brackets, splits, gun times, ...) is skipped by the
+# decoder without being built. Leaf values are Any because the API isn't
+# consistent about e.g. numbers vs. strings for ages and bibs.
+
+class _Location(TypedDict, total=False):
+    locality: Any
+    region: Any
+    country: Any
+
+class _Rankings(TypedDict, total=False):
+    overall: Any
+    gender: Any
+    primary: Any
+
+class _Result(TypedDict, total=False):
+    displayName: Any
+    gender: Any
+    age: Any
+    bib: Any
+    location: Optional[_Location]
+    rankings: Optional[_Rankings]
+    chipTimeInMillis: Any
+    status: Any
+
+class _Distance(TypedDict, total=False):
+    meters: Any
+
+class _Interval(TypedDict, total=False):
+    id: Any
+    name: Any
+    distance: Optional[_Distance]
+    results: Optional[List[_Result]]
+
+class _Race(TypedDict, total=False):
+    id: Any
+    name: Any
+
+class _Course(TypedDict, total=False):
+    race: Optional[_Race]
+    intervals: Optional[List[_Interval]]
+
+_results_decoder = msgspec.json.Decoder(List[_Course]) if msgspec is not None else None
+
+def decode_results_page(body):
+    """
+    Decodes a results page, keeping only the fields parse_results_batch uses
+    when msgspec is available. Pages that don't have the expected shape
+    (e.g. an error object) are decoded in full instead.
+    """
+    if _results_decoder is not None:
+        try:
+            return _results_decoder.decode(body)
+        except msgspec.ValidationError:
+            pass
+    return decode_json(body)
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+class ScrapeReport:
+    """
+    Aggregate outcome of scraping several events.
+    """
+
+    def __init__(self):
+        self.succeeded = []  # (event, rows)
+        self.empty = []      # event
+        self.failed = []     # (event, error)
+
+    @property
+    def total(self):
+        return len(self.succeeded) + len(self.empty) + len(self.failed)
+
+    @property
+    def rows(self):
+        return sum(rows for _, rows in self.succeeded)
+
+    def summary(self):
+        lines = [
+            f"Scraped {len(self.succeeded)}/{self.total} events ({self.rows} rows), "
+            f"{len(self.empty)} empty, {len(self.failed)} failed."
+        ]
+        for event, error in self.failed:
+            lines.append(f"  FAILED {event.get('id')} {event.get('date_str', '')}: {error}")
+        return "\n".join(lines)
+
+def run_events(events, scrape_fn, jobs=1, on_done=None):
+    """
+    Runs scrape_fn(event) for each event dict using up to `jobs` worker threads.
+    scrape_fn returns the number of rows saved (0 or None for an empty event).
+    on_done(event, rows, error), if given, is called from the calling thread as
+    each event finishes, so it can safely update progress displays.
+    Returns a ScrapeReport. Request pacing is left to the shared API client.
+    """
+    report = ScrapeReport()
+
+    def record(event, rows, error):
+        if error is not None:
+            report.failed.append((event, error))
+        elif rows:
+            report.succeeded.append((event, rows))
+        else:
+            report.empty.append(event)
+        if on_done:
+            on_done(event, rows, error)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(scrape_fn, event): event for event in events}
+        for future in as_completed(futures):
+            event = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                record(event, None, e)
+            else:
+                record(event, rows, None)
+
+    return report
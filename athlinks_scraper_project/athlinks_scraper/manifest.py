@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+from .core import IMMUTABLE_AFTER_DAYS
+
+MANIFEST_NAME = "manifest.json"
+
+def file_sha256(path):
+    """
+    Returns the hex SHA-256 of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def files_sha256(paths):
+    """
+    Returns one hex SHA-256 covering several files, in the given order.
+    """
+    return hashlib.sha256("\n".join(file_sha256(path) for path in paths).encode()).hexdigest()
+
+class ScrapeManifest:
+    """
+    Record of scraped events kept next to the output files.
+    Each entry maps an event ID to its output path, row count, event date,
+    fetch time and the SHA-256 of the written file, so re-runs can skip
+    events whose output is present, intact and final. An event saved as
+    several part files (see writers.refresh_event) lists them under 'parts'
+    and its SHA-256 covers all of them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.events = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.events = json.load(f).get('events', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable manifest {path}: {e}")
+
+    @classmethod
+    def for_directory(cls, directory):
+        return cls(os.path.join(directory, MANIFEST_NAME))
+
+    def get(self, event_id):
+        return self.events.get(str(event_id))
+
+    def resolve(self, path):
+        # Paths are stored relative to the manifest so the data directory can move.
+        return os.path.join(os.path.dirname(self.path), path)
+
+    def needs_scrape(self, event_id, changing_days=IMMUTABLE_AFTER_DAYS):
+        """
+        True if the event is missing from the manifest, its file is gone or
+        has changed on disk, or it was last fetched while its results could
+        still change (within changing_days of the event date).
+        """
+        entry = self.get(event_id)
+        if not entry or not entry.get('path'):
+            return True
+        if entry.get('parts'):
+            paths = [self.resolve(part) for part in entry['parts']]
+            if not all(os.path.exists(path) for path in paths) or files_sha256(paths) != entry.get('sha256'):
+                return True
+        else:
+            path = self.resolve(entry['path'])
+            if not os.path.exists(path) or file_sha256(path) != entry.get('sha256'):
+                return True
+
+        try:
+            event_date = datetime.strptime(entry['event_date'], '%Y-%m-%d')
+            fetched_at = datetime.fromisoformat(entry['fetched_at'])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return fetched_at < event_date + timedelta(days=changing_days)
+
+    def record(self, event_id, path, rows, event_date=None, parts=None, **extra):
+        """
+        Records a freshly written output file and saves the manifest.
+        If the event was saved as the part files `parts` instead, those are
+        recorded (path is still where a single file for it would go).
+        """
+        directory = os.path.dirname(self.path) or '.'
+        entry = {
+            'path': os.path.relpath(path, directory),
+            'rows': int(rows),
+            'event_date': event_date,
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+            'sha256': files_sha256(parts) if parts else file_sha256(path),
+        }
+        if parts:
+            entry['parts'] = [os.path.relpath(part, directory) for part in parts]
+        entry.update(extra)
+        with self.lock:
+            self.events[str(event_id)] = entry
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest-")
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'events': self.events}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
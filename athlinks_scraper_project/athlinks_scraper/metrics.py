@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+class ScrapeMetrics:
+    """
+    Thread-safe collector of scrape instrumentation.
+    Every HTTP call and pipeline stage is kept as a trace record; totals are
+    aggregated as records arrive for the Prometheus export.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = []
+        self.counters = defaultdict(float)
+        self.gauges = {}
+
+    def record(self, kind, **fields):
+        entry = {"ts": round(time.time(), 6), "kind": kind}
+        entry.update(fields)
+        with self.lock:
+            self.records.append(entry)
+            if kind == "http":
+                self._count_http(entry)
+            elif kind == "stage":
+                self._count_stage(entry)
+
+    def set_gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def _count_http(self, entry):
+        labels = _label_key({"endpoint": entry.get("endpoint") or "other", "status": entry.get("status") or "error"})
+        self.counters[("athlinks_http_requests_total", labels)] += 1
+        endpoint = _label_key({"endpoint": entry.get("endpoint") or "other"})
+        self.counters[("athlinks_http_request_seconds_sum", endpoint)] += entry.get("seconds", 0)
+        self.counters[("athlinks_http_request_seconds_count", endpoint)] += 1
+        self.counters[("athlinks_http_response_bytes_total", endpoint)] += entry.get("bytes", 0)
+        self.counters[("athlinks_http_retries_total", endpoint)] += entry.get("retries", 0)
+        if entry.get("cache") == "hit":
+            self.counters[("athlinks_http_cache_hits_total", endpoint)] += 1
+
+    def _count_stage(self, entry):
+        labels = _label_key({"stage": entry["stage"]})
+        self.counters[("athlinks_stage_seconds_sum", labels)] += entry.get("seconds", 0)
+        self.counters[("athlinks_stage_seconds_count", labels)] += 1
+        if "rows" in entry:
+            self.counters[("athlinks_stage_rows_total", labels)] += entry["rows"]
+
+    def write_trace(self, path):
+        """
+        Writes every record as one JSON object per line.
+        """
+        with self.lock:
+            records = list(self.records)
+        _atomic_write(path, "".join(json.dumps(r, default=str) + "\n" for r in records))
+
+    def prometheus_text(self):
+        """
+        Renders the aggregated counters and gauges in Prometheus text format.
+        """
+        with self.lock:
+            samples = sorted(list(self.counters.items()) + list(self.gauges.items()))
+        lines = []
+        typed = set()
+        for (name, labels), value in samples:
+            if name not in typed:
+                kind = "gauge" if (name, labels) in self.gauges else "counter"
+                lines.append(f"# TYPE {name} {kind}")
+                typed.add(name)
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+            value = int(value) if float(value).is_integer() else value
+            lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Writes a node_exporter textfile; the rename keeps scrapes from seeing partial files.
+        """
+        _atomic_write(path, self.prometheus_text())
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _atomic_write(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+_active = None
+
+def enable_metrics():
+    """
+    Starts collecting metrics process-wide. Returns the collector.
+    """
+    global _active
+    _active = ScrapeMetrics()
+    return _active
+
+def get_metrics():
+    """
+    Returns the active collector, or None if metrics are disabled.
+    """
+    return _active
+
+def record(kind, **fields):
+    if _active is not None:
+        _active.record(kind, **fields)
+
+def record_http(**fields):
+    record("http", **fields)
+
+def set_gauge(name, value, **labels):
+    if _active is not None:
+        _active.set_gauge(name, value, **labels)
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Times a pipeline stage. The yielded dict can be filled in with extra
+    fields (e.g. rows) before the block ends. A no-op when metrics are disabled.
+    """
+    info = dict(fields)
+    if _active is None:
+        yield info
+        return
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        _active.record("stage", stage=name, seconds=round(time.perf_counter() - start, 6), **info)
@@ -0,0 +1,234 @@
+"""
+Local stand-in for the reignite API, for benchmarks and offline development.
+
+Serves synthetic data for:
+    /master/{id}/metadata
+    /event/{id}/metadata
+    /event/{id}/results?from=&limit=
+
+Run it standalone with `python -m athlinks_scraper.mock_api --port 8765`, or
+use run_mock_server() and point the scraper at it with
+configure_client(base_url=server.url) / `athlinks-scraper --api-base`.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Casey", "Morgan", "Riley", "Jamie", "Drew", "Pat"]
+LAST_NAMES = ["Smith", "Jones", "Brown", "Miller", "Davis", "Wilson", "Moore", "Clark", "Lewis", "Young"]
+CITIES = [("Branford", "CT"), ("New Haven", "CT"), ("Guilford", "CT"), ("Madison", "CT"), ("Boston", "MA")]
+
+# Course names and distances (meters) handed out to synthetic courses in turn.
+COURSES = [("5K", 5000), ("5 Mile", 8046.72), ("Kids Fun Run", 1000)]
+
+class MockOptions:
+    """
+    Shape of the synthetic data and the misbehaviour to inject.
+    """
+
+    def __init__(self, results=1000, courses=1, intervals=1, events=5, latency=0.0,
+                 error_rate=0.0, throttle_rate=0.0, retry_after=1, seed=0):
+        self.results = results              # finishers per interval
+        self.courses = courses              # courses per event
+        self.intervals = intervals          # intervals per course
+        self.events = events                # child events per master event
+        self.latency = latency              # seconds added to every response
+        self.error_rate = error_rate        # fraction of requests answered with 503
+        self.throttle_rate = throttle_rate  # fraction of requests answered with 429
+        self.retry_after = retry_after      # Retry-After seconds sent with 429s
+        self.seed = seed
+
+def _event_epoch(event_id):
+    # Spread events over past Thanksgivings so year-based features have something to chew on.
+    year = 2025 - (int(event_id) % 15)
+    return int(time.mktime((year, 11, 27, 8, 0, 0, 0, 0, -1)) * 1000)
+
+def make_result(event_id, course, interval, index, dist_meters, seed=0):
+    """
+    Deterministic synthetic finisher number `index` of an interval.
+    """
+    rng = random.Random(f"{seed}-{event_id}-{course}-{interval}-{index}")
+    gender = rng.choice("MF")
+    city, region = rng.choice(CITIES)
+    # Finish times grow with place, roughly 5:00/mi to 20:00/mi.
+    pace_ms_per_meter = 186 + index * 0.05 + rng.random() * 20
+    chip = int(dist_meters * pace_ms_per_meter)
+    return {
+        "entryId": rng.randrange(10 ** 9),
+        "racerId": rng.randrange(10 ** 8),
+        "displayName": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "gender": gender,
+        "age": rng.randint(8, 85),
+        "bib": str(1000 + index),
+        "location": {"locality": city, "region": region, "country": "USA"},
+        "rankings": {"overall": index + 1, "gender": index // 2 + 1, "primary": index // 10 + 1},
+        "chipTimeInMillis": chip,
+        "gunTimeInMillis": chip + rng.randint(0, 60000),
+        "status": "CONF",
+        # Heavy sub-objects the scraper ignores.
+        "brackets": [
+            {"id": b, "name": f"Bracket {b}", "rank": index + 1, "totalAthletes": 1000} for b in range(3)
+        ],
+        "splits": [
+            {"name": f"Split {s}", "timeInMillis": chip * (s + 1) // 4, "pace": {"value": 0}} for s in range(4)
+        ],
+    }
+
+def make_results_page(event_id, from_index, limit, options):
+    courses = []
+    for c in range(options.courses):
+        name, meters = COURSES[c % len(COURSES)]
+        intervals = []
+        for i in range(options.intervals):
+            stop = min(from_index + limit, options.results)
+            intervals.append({
+                "id": i,
+                "name": "Full Course" if i == 0 else f"Interval {i}",
+                "distance": {"meters": meters},
+                "results": [make_result(event_id, c, i, n, meters, options.seed) for n in range(from_index, stop)],
+            })
+        courses.append({"race": {"id": c, "name": name}, "intervals": intervals})
+    return courses
+
+def make_event_metadata(event_id, options):
+    return {
+        "id": int(event_id),
+        "name": f"Mock Turkey Trot {int(event_id) % 1000}",
+        "masterId": int(event_id) // 100,  # make_master_metadata numbers children master_id * 100 + n
+        "start": {"epoch": _event_epoch(event_id)},
+        "courses": [
+            {
+                "id": c,
+                "name": COURSES[c % len(COURSES)][0],
+                "distance": {"meters": COURSES[c % len(COURSES)][1]},
+            }
+            for c in range(options.courses)
+        ],
+    }
+
+def make_master_metadata(master_id, options):
+    base = int(master_id) * 100
+    return {
+        "id": int(master_id),
+        "name": f"Mock Master {master_id}",
+        "events": [
+            {"id": base + n, "name": f"Mock Turkey Trot {n}", "start": {"epoch": _event_epoch(base + n)}}
+            for n in range(options.events)
+        ],
+    }
+
+_ROUTES = [
+    (re.compile(r'^/master/(\d+)/metadata$'), "master"),
+    (re.compile(r'^/event/(\d+)/metadata$'), "metadata"),
+    (re.compile(r'^/event/(\d+)/results$'), "results"),
+]
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    options = MockOptions()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        options = self.options
+        if options.latency:
+            time.sleep(options.latency)
+
+        roll = random.random()
+        if roll < options.throttle_rate:
+            return self._send(429, {"error": "Too Many Requests"}, {"Retry-After": str(options.retry_after)})
+        if roll < options.throttle_rate + options.error_rate:
+            return self._send(503, {"error": "Service Unavailable"})
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        for pattern, endpoint in _ROUTES:
+            match = pattern.match(url.path)
+            if not match:
+                continue
+            item_id = match.group(1)
+            if endpoint == "master":
+                return self._send(200, make_master_metadata(item_id, options))
+            if endpoint == "metadata":
+                return self._send(200, make_event_metadata(item_id, options))
+            from_index = int(query.get("from", ["0"])[0])
+            limit = int(query.get("limit", ["100"])[0])
+            return self._send(200, make_results_page(item_id, from_index, limit, options))
+
+        self._send(404, {"error": "Not Found"})
+
+class MockApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def make_mock_server(host="127.0.0.1", port=0, **options):
+    """
+    Builds (but doesn't start) a mock API server with the given MockOptions.
+    """
+    handler = type("ConfiguredMockApiHandler", (MockApiHandler,), {"options": MockOptions(**options)})
+    return MockApiServer((host, port), handler)
+
+def start_mock_server(host="127.0.0.1", port=0, **options):
+    """
+    Starts the mock API on a background thread (port 0 picks a free port).
+    Returns the server; server.url is its base URL and shutdown() stops it.
+    """
+    server = make_mock_server(host, port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+@contextmanager
+def run_mock_server(**options):
+    """
+    Context manager around start_mock_server().
+    """
+    server = start_mock_server(**options)
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic reignite API locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--results", type=int, default=1000, help="Finishers per interval.")
+    parser.add_argument("--courses", type=int, default=1)
+    parser.add_argument("--intervals", type=int, default=1)
+    parser.add_argument("--events", type=int, default=5, help="Child events per master event.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    args = parser.parse_args()
+
+    options = vars(args).copy()
+    server = make_mock_server(options.pop("host"), options.pop("port"), **options)
+    print(f"Mock reignite API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
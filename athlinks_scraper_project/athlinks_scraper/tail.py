@@ -0,0 +1,290 @@
+"""
+`athlinks-scraper tail`: follows an event while it is being timed and appends
+new finishers to the partitioned dataset within seconds of them being posted.
+
+The results API pages every course interval separately: the page at `from`
+holds rows from..from+limit of *each* interval. So the tail keeps, per
+(course, interval), how many rows it has stored, plus the offset of the
+first page that wasn't full yet. Each poll re-reads from that offset and
+keeps only the rows past each interval's stored count. New rows are written
+as a segment file next to the event's part file:
+
+    master_id=M/year=Y/part-{event_id}-{first_row:09d}.parquet
+
+Segments are only ever added, so readers such as the dashboard can load just
+the new files. When tailing stops, the segments are compacted into
+part-{event_id}.parquet. The tail's progress is kept in
+.tail/{event_id}.json under the data directory. A part file the tail can't
+continue from (e.g. written by a normal scrape) is moved to
+.tail/{event_id}.replaced.parquet while the event is re-read, so readers
+never see it next to segments holding the same rows. Corrections to rows already
+stored are not picked up; run a --refresh (or a normal scrape) after the
+race for that.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .core import PAGE_LIMIT, API_BASE, DEFAULT_RATE_LIMIT, configure_client
+from .core import describe_event, extract_event_id, fetch_metadata, iter_result_pages, parse_results_batch
+from .cache import ResponseCache, DEFAULT_CACHE_DIR
+from .metrics import stage
+from .writers import open_writer, partition_path
+
+# Default seconds between polls.
+DEFAULT_TAIL_INTERVAL = 15
+
+def _file_stamp(path):
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def interval_key(course, interval, course_index, interval_index):
+    """
+    Identifies one course interval across pages of the results API, by its
+    ids (or names), falling back to its position on the page.
+    """
+    race = course.get('race') or {}
+    race_key = race.get('id', race.get('name', course_index))
+    return f"{race_key}/{interval.get('id', interval.get('name', interval_index))}"
+
+class EventTail:
+    """
+    Append-only store of one event's results: its part file (if any) plus
+    numbered segment files holding rows appended since, and the tail state
+    saying how far each course interval has been read.
+    """
+
+    def __init__(self, part_path, event_id, state_dir, limit=PAGE_LIMIT):
+        self.part_path = part_path
+        self.event_id = str(event_id)
+        self.dir = os.path.dirname(part_path)
+        self.state_path = os.path.join(state_dir, f"{self.event_id}.json")
+        self.replaced_path = os.path.join(state_dir, f"{self.event_id}.replaced.parquet")
+        self.limit = limit
+        self.segment_re = re.compile(rf'^part-{re.escape(self.event_id)}-(\d+)\.parquet$')
+
+        self.offset = 0          # first page that wasn't full when last read
+        self.intervals = {}      # interval_key -> rows stored
+        self.rows = 0            # rows in the segments (and the part file unless replacing it)
+        self.segment_names = []
+        self.replace_part = False
+        self._load()
+
+    def _load(self):
+        state = None
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        part_stamp = _file_stamp(self.part_path)
+        if (state is None or state.get('limit') != self.limit
+                or (not state.get('replace_part') and state.get('part') != part_stamp)):
+            # No usable progress for what is on disk (e.g. the part file came from a
+            # normal scrape): read the event from the start and replace the part file.
+            if part_stamp is not None:
+                print(f"No tail state matches {self.part_path}; re-reading Event ID {self.event_id} "
+                      f"from the start; it is set aside until the segments replace it.")
+            state = {'replace_part': part_stamp is not None}
+
+        self.offset = state.get('offset', 0)
+        self.intervals = state.get('intervals', {})
+        self.rows = state.get('rows', 0)
+        self.segment_names = state.get('segments', [])
+        self.replace_part = state.get('replace_part', False)
+
+        if self.replace_part and os.path.exists(self.part_path):
+            # The segments will hold every row again; keep the old file out of readers' sight.
+            self._save()
+            os.replace(self.part_path, self.replaced_path)
+
+        # Segments written by a run that died before saving its state aren't counted; drop them.
+        for _, path in self.segments():
+            if os.path.basename(path) not in self.segment_names:
+                os.remove(path)
+        self.segment_names = [name for name in self.segment_names if os.path.exists(os.path.join(self.dir, name))]
+
+    def _save(self):
+        state = {
+            'event_id': self.event_id,
+            'limit': self.limit,
+            'offset': self.offset,
+            'intervals': self.intervals,
+            'rows': self.rows,
+            'segments': self.segment_names,
+            'replace_part': self.replace_part,
+            'part': _file_stamp(self.part_path),
+        }
+        directory = os.path.dirname(self.state_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tail-")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def segments(self):
+        """
+        Returns [(first_row, path)] of the segment files on disk, in row order.
+        """
+        found = []
+        for path in glob.glob(os.path.join(self.dir, f"part-{self.event_id}-*.parquet")):
+            match = self.segment_re.match(os.path.basename(path))
+            if match:
+                found.append((int(match.group(1)), path))
+        return sorted(found)
+
+    def append(self, batches, offset, intervals):
+        """
+        Writes batches as a new segment and records the read position they
+        bring the tail to. Returns the number of rows appended.
+        """
+        rows = sum(b.num_rows for b in batches)
+        if rows:
+            name = f"part-{self.event_id}-{self.rows:09d}.parquet"
+            with open_writer(os.path.join(self.dir, name), "parquet") as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+            self.segment_names.append(name)
+            self.rows += rows
+        if rows or offset != self.offset or intervals != self.intervals:
+            self.offset = offset
+            self.intervals = intervals
+            self._save()
+        return rows
+
+    def compact(self):
+        """
+        Folds all segments into the part file and deletes them.
+        """
+        segments = [os.path.join(self.dir, name) for name in self.segment_names]
+        if not segments:
+            # Nothing was read again: put a part file that was moved aside back.
+            if os.path.exists(self.replaced_path) and not os.path.exists(self.part_path):
+                os.replace(self.replaced_path, self.part_path)
+                self._save()
+            return
+        keep_part = os.path.exists(self.part_path) and not self.replace_part
+        sources = ([self.part_path] if keep_part else []) + segments
+        with open_writer(self.part_path, "parquet") as writer:
+            for path in sources:
+                for batch in pq.ParquetFile(path).iter_batches():
+                    writer.write_batch(pa.RecordBatch.from_arrays(batch.columns, schema=writer.schema))
+        self.segment_names = []
+        self.replace_part = False
+        self._save()
+        for path in segments:
+            os.remove(path)
+        if os.path.exists(self.replaced_path):
+            os.remove(self.replaced_path)
+
+def poll_new_results(event_id, tail, event_info, client=None):
+    """
+    Fetches results from the tail's offset onwards and keeps, per course
+    interval, only the rows past what the tail has stored.
+    Returns (batches, next offset, interval row counts) for EventTail.append.
+    """
+    limit = tail.limit
+    intervals = dict(tail.intervals)
+    offset = tail.offset
+    batches = []
+    for page, (data, _) in enumerate(iter_result_pages(event_id, limit, client=client, start=tail.offset)):
+        page_from = tail.offset + page * limit
+        page_full = False
+        fresh_blocks = []
+        for course_index, course in enumerate(data if isinstance(data, list) else []):
+            fresh_intervals = []
+            for interval_index, interval in enumerate(course.get('intervals') or []):
+                results = interval.get('results') or []
+                page_full = page_full or len(results) >= limit
+                key = interval_key(course, interval, course_index, interval_index)
+                stored = intervals.get(key, 0)
+                fresh = results[max(0, stored - page_from):]
+                if fresh:
+                    fresh_intervals.append(dict(interval, results=fresh))
+                if results:
+                    intervals[key] = max(stored, page_from + len(results))
+            if fresh_intervals:
+                fresh_blocks.append(dict(course, intervals=fresh_intervals))
+
+        # Later polls restart at the first page that isn't full yet.
+        if page_full and page_from == offset:
+            offset = page_from + limit
+
+        with stage("parse", event_id=str(event_id)) as info:
+            batch = parse_results_batch(fresh_blocks, event_info=event_info)
+            info["rows"] = batch.num_rows
+        if batch.num_rows:
+            batches.append(batch)
+    return batches, offset, intervals
+
+def tail_event(event_id, data_dir, interval=DEFAULT_TAIL_INTERVAL, idle_polls=None, max_polls=None, client=None):
+    """
+    Polls an event every `interval` seconds, appending new finishers as
+    segment files under data_dir, until interrupted, after `idle_polls`
+    consecutive polls without new rows, or after `max_polls` polls. The
+    segments are then compacted into the event's part file.
+    Returns the number of rows stored.
+    """
+    metadata = fetch_metadata(event_id, client=client)
+    event_info = describe_event(metadata)
+    part_path = partition_path(data_dir, metadata.get('masterId'), event_info[2], event_info[0] or event_id)
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+    tail = EventTail(part_path, event_info[0] or event_id, os.path.join(data_dir, ".tail"))
+    print(f"Tailing Event ID {event_id} into {os.path.dirname(part_path)} ({tail.rows} rows stored)")
+
+    polls = idle = 0
+    try:
+        while True:
+            started = time.time()
+            try:
+                added = tail.append(*poll_new_results(event_id, tail, event_info, client=client))
+            except Exception as e:
+                print(f"Error polling Event ID {event_id}: {e}")
+                added = 0
+            if added:
+                print(f"{time.strftime('%H:%M:%S')} +{added} finishers ({tail.rows} total)")
+                idle = 0
+            else:
+                idle += 1
+
+            polls += 1
+            if (idle_polls and idle >= idle_polls) or (max_polls and polls >= max_polls):
+                break
+            time.sleep(max(0, interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        print("Stopping.")
+    finally:
+        tail.compact()
+    print(f"Saved {tail.rows} rows to {part_path}")
+    return tail.rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="athlinks-scraper tail",
+                                     description="Follow an event live, appending new finishers as they are posted.")
+    parser.add_argument("event", help="Event URL or Event ID.")
+    parser.add_argument("--data-dir", "-d", default="data", help="Partitioned dataset directory to append to.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_TAIL_INTERVAL, help="Seconds between polls.")
+    parser.add_argument("--idle-polls", type=int, help="Stop after this many polls in a row without new finishers.")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help="Maximum API requests per second.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory for cached API responses.")
+    parser.add_argument("--api-base", default=API_BASE, help="Base URL of the results API.")
+    args = parser.parse_args(argv)
+
+    event_id = args.event if args.event.isdigit() else extract_event_id(args.event)
+    if not event_id:
+        parser.error(f"not an event ID or results URL: {args.event}")
+
+    # Results pages change between polls, so they must never come from the cache.
+    configure_client(base_url=args.api_base, rate_limit=args.rate_limit,
+                     cache=ResponseCache(args.cache_dir, ttls={"results": 0}))
+    tail_event(event_id, args.data_dir, args.interval, args.idle_polls)
@@ -0,0 +1,222 @@
+"""
+`athlinks-scraper watch`: keeps a data directory up to date with new years of
+one or more master events.
+
+Every poll costs one /master/{id}/metadata request per master event. Child
+events not seen before are scraped into the partitioned dataset once they
+have results; events that were already there when a master was first
+watched are left alone, except recent ones whose results may still be
+arriving. An event stays pending until its results are final (see
+is_event_final): until then every poll refreshes it into one part file per
+page, re-parsing and rewriting only the pages that changed, and once final
+it gets one last full scrape into a single part file. What has been seen and scraped is kept in a small state file, so a
+restarted watcher picks up where it left off.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .core import API_BASE, DEFAULT_RATE_LIMIT, IMMUTABLE_AFTER_DAYS, configure_client
+from .core import extract_master_id, fetch_master_events, fetch_metadata, is_event_final
+from .cache import ResponseCache, DEFAULT_CACHE_DIR
+from .catalog import expected_pages
+from .checkpoint import PageStore, ScrapeCheckpoint
+from .jobs import run_events
+from .manifest import ScrapeManifest
+from .writers import page_parts, partition_path, refresh_event, write_event
+
+STATE_NAME = "watch_state.json"
+
+# Default seconds between polls.
+DEFAULT_INTERVAL = 3600
+
+PENDING = "pending"
+DONE = "done"
+
+class WatchState:
+    """
+    Child events seen per master event and whether they have been scraped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.masters = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.masters = json.load(f).get('masters', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable watch state {path}: {e}")
+
+    def events(self, master_id):
+        return self.masters.setdefault(str(master_id), {'events': {}})['events']
+
+    def is_known(self, master_id):
+        return str(master_id) in self.masters
+
+    def mark(self, master_id, event_id, status, rows=None):
+        with self.lock:
+            self.events(master_id)[str(event_id)] = {
+                'status': status,
+                'rows': rows,
+                'checked_at': time.time(),
+            }
+
+    def pending(self, master_id):
+        return [event_id for event_id, entry in self.events(master_id).items() if entry['status'] == PENDING]
+
+    def save(self):
+        with self.lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".watch-")
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'masters': self.masters}, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+def _is_recent(event, days=IMMUTABLE_AFTER_DAYS):
+    # Events without a date are treated as recent so they get looked at.
+    if not event.get('date'):
+        return True
+    return time.time() - event['date'] / 1000 < days * 86400
+
+def poll_master(master_id, state, manifest):
+    """
+    Fetches a master event's child events and records new ones as pending.
+    Returns the child events that are pending and have started.
+    On the first poll of a master, only events from the last
+    IMMUTABLE_AFTER_DAYS days (or in the future) are pending; older ones are
+    assumed to be covered by an earlier backfill unless the manifest lacks them.
+    """
+    events = fetch_master_events(master_id)
+    if not events:
+        # Also what a failed fetch looks like; don't let it count as the first poll.
+        return []
+    first_poll = not state.is_known(master_id)
+    known = state.events(master_id)
+
+    for event in events:
+        event_id = str(event['id'])
+        if event_id in known:
+            continue
+        if first_poll and not _is_recent(event) and manifest.get(event_id):
+            state.mark(master_id, event_id, DONE, manifest.get(event_id).get('rows'))
+        else:
+            print(f"New event for master {master_id}: {event['name']} ({event['date_str']})")
+            state.mark(master_id, event_id, PENDING)
+
+    pending = set(state.pending(master_id))
+    now_ms = time.time() * 1000
+    return [e for e in events if str(e['id']) in pending and (e.get('date') or 0) <= now_ms]
+
+def watch(master_ids, data_dir, interval=DEFAULT_INTERVAL, state_path=None, jobs=1, once=False):
+    """
+    Polls the master events every `interval` seconds and scrapes pending
+    child events into the partitioned dataset under data_dir. An event stays
+    pending until it has results and they are final. Runs until interrupted,
+    or for a single poll with once=True.
+    """
+    state = WatchState(state_path or os.path.join(data_dir, STATE_NAME))
+    manifest = ScrapeManifest.for_directory(data_dir)
+    checkpoint_dir = os.path.join(data_dir, ".checkpoints")
+    pages_dir = os.path.join(data_dir, ".pages")
+
+    while True:
+        started = time.time()
+        todo = []
+        for master_id in master_ids:
+            try:
+                todo.extend((master_id, event) for event in poll_master(master_id, state, manifest))
+            except Exception as e:
+                print(f"Error polling master {master_id}: {e}")
+        state.save()
+
+        final = set()
+
+        def scrape(item):
+            master_id, event = item
+            event_id = event['id']
+            path = partition_path(data_dir, master_id, event['date_str'], event_id)
+            metadata = fetch_metadata(event_id)
+            store = PageStore(pages_dir, event_id)
+            if not is_event_final(metadata):
+                # Results are still coming in: only pages that changed since the last poll are re-parsed.
+                rows, changed = refresh_event(event_id, path, "parquet", store, metadata, partitioned=True)
+                if rows and changed:
+                    manifest.record(event_id, path, rows, event_date=event['date_str'], parts=page_parts(path),
+                                    master_id=master_id)
+                return rows
+            elif manifest.needs_scrape(event_id):
+                # One full scrape once the results are final; resume=True so a watcher
+                # killed mid-scrape continues from its checkpoint.
+                rows = write_event(event_id, path, "parquet", metadata,
+                                   checkpoint=ScrapeCheckpoint(checkpoint_dir, event_id), resume=True,
+                                   expected_pages=expected_pages(manifest.get(event_id)))
+                store.clear()
+                final.add(str(event_id))
+            else:
+                final.add(str(event_id))
+                return manifest.get(event_id).get('rows')
+            if rows:
+                manifest.record(event_id, path, rows, event_date=event['date_str'], master_id=master_id)
+            return rows
+
+        def on_done(item, rows, error):
+            master_id, event = item
+            if error is not None:
+                print(f"Failed to scrape event {event['id']}: {error}")
+            elif rows and str(event['id']) in final:
+                print(f"Saved {rows} rows for {event['name']} ({event['date_str']})")
+                state.mark(master_id, event['id'], DONE, rows)
+                state.save()
+            elif rows:
+                # Checked again on the next poll, until its results are final.
+                print(f"{rows} rows so far for {event['name']} ({event['date_str']}); results may still change")
+                state.mark(master_id, event['id'], PENDING, rows)
+                state.save()
+            else:
+                print(f"No results yet for {event['name']} ({event['date_str']})")
+
+        if todo:
+            print(run_events(todo, scrape, jobs=jobs, on_done=on_done).summary())
+        else:
+            print(f"No new events to scrape ({time.strftime('%Y-%m-%d %H:%M:%S')}).")
+
+        if once:
+            return
+        time.sleep(max(0, interval - (time.time() - started)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="athlinks-scraper watch",
+                                     description="Keep scraping new years of master events into a data directory.")
+    parser.add_argument("masters", nargs="+", help="Master event IDs or URLs (e.g. https://www.athlinks.com/event/15776).")
+    parser.add_argument("--data-dir", "-d", default="data", help="Partitioned dataset directory to scrape into.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Seconds between polls.")
+    parser.add_argument("--state", help=f"State file (default: {STATE_NAME} in the data directory).")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit (e.g. from cron).")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of events to scrape concurrently.")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help="Maximum API requests per second.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory for cached API responses.")
+    parser.add_argument("--api-base", default=API_BASE, help="Base URL of the results API.")
+    args = parser.parse_args(argv)
+
+    master_ids = []
+    for item in args.masters:
+        master_id = item if item.isdigit() else extract_master_id(item)
+        if not master_id:
+            parser.error(f"not a master event ID or URL: {item}")
+        master_ids.append(master_id)
+
+    # Master listings must be fetched fresh on every poll to notice new events.
+    cache = ResponseCache(args.cache_dir, ttls={"master": 0})
+    configure_client(base_url=args.api_base, rate_limit=args.rate_limit, cache=cache)
+
+    print(f"Watching master event(s) {', '.join(master_ids)} every {args.interval:g}s into {args.data_dir}")
+    try:
+        watch(master_ids, args.data_dir, args.interval, args.state, args.jobs, args.once)
+    except KeyboardInterrupt:
+        print("Stopped.")
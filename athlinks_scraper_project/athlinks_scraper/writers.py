@@ -0,0 +1,388 @@
+import glob
+import json
+import os
+import re
+import tempfile
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from .metrics import stage
+from .core import RESULTS_SCHEMA, PAGE_LIMIT, iter_result_batches, is_event_final
+from .core import describe_event, iter_hashed_result_pages, parse_results_batch
+
+FORMATS = ("csv", "parquet", "ndjson")
+
+# Low-cardinality string columns worth dictionary-encoding in Parquet.
+DICTIONARY_COLUMNS = ["Event Name", "Event Date", "Race Type", "Gender", "City", "State", "Country", "Status"]
+
+# Rows buffered per Parquet row group; result pages are far smaller than this.
+ROW_GROUP_SIZE = 64 * 1024
+
+# Hive-style dataset layout: {root}/master_id=.../year=.../part-{event_id}.parquet
+PARTITION_DEFAULT = "__HIVE_DEFAULT_PARTITION__"
+
+def partition_path(root, master_id, event_date, event_id):
+    """
+    Path of an event's Parquet file in a Hive-partitioned dataset under root,
+    partitioned by master event and year. Unknown values go to the default partition.
+    """
+    year = (event_date or "")[:4]
+    return os.path.join(
+        root,
+        f"master_id={master_id or PARTITION_DEFAULT}",
+        f"year={year if year.isdigit() else PARTITION_DEFAULT}",
+        f"part-{event_id}.parquet",
+    )
+
+def page_part_path(path, offset):
+    """
+    Path of the part file holding the page at `offset` of an event refreshed
+    into a partitioned dataset: part-{event_id}-page{offset:09d}.parquet next
+    to the event's part-{event_id}.parquet at `path`.
+    """
+    return f"{path[:-len('.parquet')]}-page{offset:09d}.parquet"
+
+def page_parts(path):
+    """
+    Returns the page part files (see page_part_path) next to `path`, in page order.
+    """
+    if not path.endswith(".parquet"):
+        return []
+    return sorted(glob.glob(glob.escape(path[:-len('.parquet')]) + "-page" + "[0-9]" * 9 + ".parquet"))
+
+# Flat files written by earlier versions of the dashboard, one per master event and year.
+LEGACY_FLAT_RE = re.compile(r'^scraped_(\d+)_(\d{4})\.parquet$')
+
+def migrate_flat_files(root, manifest=None):
+    """
+    Moves the old flat scraped_{master_id}_{year}.parquet files in root into
+    the partitioned layout, as part-{event_id}.parquet with the Event ID
+    read from the file, and records them in the manifest (if given). The
+    manifest then knows the year is saved and readers don't see it twice.
+    A flat file whose partition file already exists is deleted instead.
+    Returns the number of flat files moved or deleted.
+    """
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return 0
+
+    count = 0
+    for name in names:
+        match = LEGACY_FLAT_RE.match(name)
+        if not match:
+            continue
+        path = os.path.join(root, name)
+        try:
+            columns = pq.read_table(path, columns=["Event ID", "Event Date"]).to_pydict()
+            event_ids = sorted({str(v) for v in columns["Event ID"] if v is not None})
+            if len(event_ids) != 1:
+                print(f"Not migrating {path}: expected one Event ID, found {len(event_ids)}")
+                continue
+            event_id = event_ids[0]
+            event_date = next((str(v)[:10] for v in columns["Event Date"] if v), None)
+            target = partition_path(root, match.group(1), event_date or match.group(2), event_id)
+            if os.path.exists(target) or page_parts(target):
+                os.remove(path)
+                print(f"Removed {path}; {target} holds the same year")
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                fetched_at = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec='seconds')
+                os.replace(path, target)
+                if manifest is not None:
+                    rows = pq.ParquetFile(target).metadata.num_rows
+                    manifest.record(event_id, target, rows, event_date=event_date,
+                                    master_id=match.group(1), fetched_at=fetched_at)
+                print(f"Moved {path} to {target}")
+            count += 1
+        except Exception as e:
+            print(f"Error migrating {path}: {e}")
+    return count
+
+def format_for_path(path, default="csv"):
+    """
+    Guesses the output format from a filename's extension.
+    """
+    ext = os.path.splitext(path or "")[1].lower().lstrip('.')
+    if ext == "jsonl":
+        ext = "ndjson"
+    return ext if ext in FORMATS else default
+
+class BatchWriter:
+    """
+    Streams RecordBatches to a file. Output goes to a temp file in the same
+    directory and is renamed into place on close(), so readers never see a
+    half-written file; abort() discards it. Usable as a context manager.
+    """
+
+    def __init__(self, path, schema=RESULTS_SCHEMA):
+        self.path = path
+        self.schema = schema
+        self.rows = 0
+        self.done = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        os.close(fd)
+
+    def write_batch(self, batch):
+        self.rows += batch.num_rows
+        self._write(batch)
+
+    def _write(self, batch):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        if self.done:
+            return
+        self.done = True
+        self._finish()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        if self.done:
+            return
+        self.done = True
+        try:
+            self._finish()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class ParquetBatchWriter(BatchWriter):
+    """
+    Parquet with zstd compression, dictionary-encoded categorical columns and
+    row groups of up to ROW_GROUP_SIZE rows. Every row group carries min/max
+    statistics so query engines can skip the ones a filter rules out.
+    """
+
+    def __init__(self, path, schema=RESULTS_SCHEMA, row_group_size=ROW_GROUP_SIZE):
+        super().__init__(path, schema)
+        self.row_group_size = row_group_size
+        self.pending = []
+        self.pending_rows = 0
+        self.writer = pq.ParquetWriter(
+            self.tmp_path, schema,
+            compression="zstd",
+            use_dictionary=[c for c in DICTIONARY_COLUMNS if c in schema.names],
+            write_statistics=True,
+        )
+
+    def _write(self, batch):
+        self.pending.append(batch)
+        self.pending_rows += batch.num_rows
+        if self.pending_rows >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self.writer.write_table(pa.Table.from_batches(self.pending, schema=self.schema),
+                                    row_group_size=self.row_group_size)
+            self.pending = []
+            self.pending_rows = 0
+
+    def _finish(self):
+        if self.writer is not None:
+            self._flush()
+            self.writer.close()
+            self.writer = None
+
+class CsvBatchWriter(BatchWriter):
+    def __init__(self, path, schema=RESULTS_SCHEMA):
+        super().__init__(path, schema)
+        self.writer = pacsv.CSVWriter(self.tmp_path, schema,
+                                      write_options=pacsv.WriteOptions(quoting_style="needed"))
+
+    def _write(self, batch):
+        self.writer.write_batch(batch)
+
+    def _finish(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+class NdjsonBatchWriter(BatchWriter):
+    """
+    One JSON object per line, keyed by column name.
+    """
+
+    def __init__(self, path, schema=RESULTS_SCHEMA):
+        super().__init__(path, schema)
+        self.file = open(self.tmp_path, 'w', encoding='utf-8')
+
+    def _write(self, batch):
+        for row in batch.to_pylist():
+            self.file.write(json.dumps(row, ensure_ascii=False))
+            self.file.write("\n")
+
+    def _finish(self):
+        if not self.file.closed:
+            self.file.close()
+
+_WRITERS = {
+    "csv": CsvBatchWriter,
+    "parquet": ParquetBatchWriter,
+    "ndjson": NdjsonBatchWriter,
+}
+
+def open_writer(path, fmt, schema=RESULTS_SCHEMA):
+    """
+    Returns a BatchWriter for the given format ('csv', 'parquet' or 'ndjson').
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    return _WRITERS[fmt](path, schema)
+
+def write_event(event_id, path, fmt, metadata=None, checkpoint=None, resume=False, expected_pages=None):
+    """
+    Scrapes an event straight into a file, one page at a time.
+    expected_pages (e.g. from catalog.expected_pages) keeps the read-ahead
+    from overshooting the end of the event.
+    With a checkpoint, every page is also saved there as it is written; with
+    resume=True, pages saved by an earlier interrupted run are replayed and
+    fetching continues from the checkpoint's offset. The checkpoint is
+    cleared once the file is complete.
+    Returns the number of rows written (0 for an event with no results, in
+    which case no file is created).
+    """
+    start = 0
+    if checkpoint is not None:
+        if resume:
+            start = checkpoint.load()
+            if start:
+                print(f"Resuming Event ID {event_id} from offset {start}")
+        else:
+            checkpoint.clear()
+
+    with open_writer(path, fmt) as writer:
+        if start:
+            for batch in checkpoint.iter_batches():
+                writer.write_batch(batch)
+
+        offset = start
+        for batch in iter_result_batches(event_id, metadata, immutable=is_event_final(metadata), start=start,
+                                         expected_pages=expected_pages):
+            with stage("write", event_id=str(event_id), format=fmt) as info:
+                writer.write_batch(batch)
+                info["rows"] = batch.num_rows
+            if checkpoint is not None:
+                with stage("checkpoint", event_id=str(event_id)):
+                    checkpoint.save_page(offset, batch)
+            offset += PAGE_LIMIT
+
+        if writer.rows == 0:
+            writer.abort()
+        else:
+            # Closing flushes buffered row groups and renames the file into place.
+            with stage("close", event_id=str(event_id), format=fmt) as info:
+                writer.close()
+                info["rows"] = writer.rows
+            # Pages of an earlier --refresh hold the same rows.
+            for part in page_parts(path):
+                os.remove(part)
+
+    if checkpoint is not None:
+        checkpoint.clear()
+    return writer.rows
+
+def refresh_event(event_id, path, fmt, store, metadata=None, partitioned=False):
+    """
+    Re-fetches every page of an event, but only parses the pages whose raw
+    response differs from the hash kept in the PageStore, and stores just
+    those. The output file is reassembled from the stored pages only if
+    something changed (or it doesn't exist yet), without parsing anything else.
+    With partitioned=True (`path` being the event's part file in a
+    partitioned dataset), every page is written as its own part file instead
+    (see page_part_path), so only the changed pages are written again and
+    the parts of dropped pages are deleted.
+    Returns (rows saved, number of pages changed or dropped).
+    """
+    store.load()
+    event_info = describe_event(metadata)
+    print(f"Refreshing results for Event ID: {event_id}...")
+
+    offset = 0
+    changed = 0
+    changed_offsets = set()
+    # The pages stored last time are the best guess at where the event ends now.
+    pages = len(store.pages) or None
+    for data, _, digest in iter_hashed_result_pages(event_id, limit=store.limit, expected_pages=pages):
+        if store.digest(offset) != digest:
+            with stage("parse", event_id=str(event_id)) as info:
+                batch = parse_results_batch(data if isinstance(data, list) else [], event_info=event_info)
+                info["rows"] = batch.num_rows
+            with stage("page_store", event_id=str(event_id)):
+                store.save_page(offset, digest, batch)
+            changed_offsets.add(offset)
+            changed += 1
+        offset += store.limit
+    changed += store.truncate(offset)
+    store.save()
+
+    if partitioned:
+        written = _write_page_parts(event_id, path, store, changed_offsets)
+        return store.rows, changed or written
+
+    if not changed and os.path.exists(path):
+        print(f"No pages changed for Event ID {event_id}")
+        return store.rows, 0
+
+    print(f"{changed} page(s) changed for Event ID {event_id}; rewriting {path}")
+    with open_writer(path, fmt) as writer:
+        with stage("write", event_id=str(event_id), format=fmt) as info:
+            for batch in store.iter_batches():
+                writer.write_batch(batch)
+            info["rows"] = writer.rows
+        if writer.rows == 0:
+            writer.abort()
+    return writer.rows, changed
+
+def _write_page_parts(event_id, path, store, changed_offsets):
+    """
+    Writes the stored pages that changed (or whose part file is missing) as
+    page part files next to `path` and deletes the parts of pages that are
+    gone or empty. Returns the number of part files written or deleted.
+    """
+    if os.path.exists(path):
+        # A part file from a normal scrape holds the same rows as the pages.
+        os.remove(path)
+
+    count = 0
+    wanted = set()
+    for offset, page in sorted(store.pages.items()):
+        part = page_part_path(path, offset)
+        if not page['rows']:
+            continue
+        wanted.add(part)
+        if offset in changed_offsets or not os.path.exists(part):
+            with open_writer(part, "parquet") as writer:
+                with stage("write", event_id=str(event_id), format="parquet") as info:
+                    for batch in store.iter_batches([offset]):
+                        writer.write_batch(batch)
+                    info["rows"] = writer.rows
+            count += 1
+    for part in page_parts(path):
+        if part not in wanted:
+            os.remove(part)
+            count += 1
+
+    if count:
+        print(f"Wrote {count} page part(s) for Event ID {event_id} next to {path}")
+    else:
+        print(f"No pages changed for Event ID {event_id}")
+    return count
@@ -0,0 +1,147 @@
+"""
+Scraper throughput benchmark against the local mock reignite API.
+
+For each event size it reports pages/sec, rows/sec, parse time and peak RSS
+for fetch_results, parse_results and get_results. Every case runs in its own
+process so peak RSS belongs to that case alone.
+
+    python benchmarks/bench_scraper.py --sizes 1000 10000 50000 --latency 0.02
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import queue as queue_module
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from athlinks_scraper import core
+from athlinks_scraper.catalog import expected_pages
+from athlinks_scraper.mock_api import run_mock_server
+
+CASES = ["fetch_results", "parse_results", "get_results"]
+
+# Seconds a case may run before it is killed and reported as failed.
+CASE_TIMEOUT = 600
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS).
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+def _run_case(case, api_url, event_id, size, queue):
+    core.configure_client(base_url=api_url, rate_limit=None)
+    result = {"case": case}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if case == "fetch_results":
+            # Count page requests (including any read past the end) around the real fetch_results.
+            requests = []
+            fetch_page = core._fetch_results_page
+            def counting_fetch_page(*args, **kwargs):
+                requests.append(1)
+                return fetch_page(*args, **kwargs)
+            core._fetch_results_page = counting_fetch_page
+            # The page estimate a manifest gives after an earlier scrape (one course, one
+            # interval), so the read-ahead stops at the end.
+            expected = expected_pages({'rows': size})
+
+            start = time.perf_counter()
+            blocks = core.fetch_results(event_id, expected_pages=expected)
+            result["seconds"] = time.perf_counter() - start
+            result["pages"] = len(requests)
+            result["rows"] = core.count_page_results(blocks)
+
+        elif case == "parse_results":
+            blocks = core.fetch_results(event_id)
+            metadata = core.fetch_metadata(event_id)
+            start = time.perf_counter()
+            batch = core.parse_results_batch(blocks, metadata)
+            result["seconds"] = time.perf_counter() - start
+            result["rows"] = batch.num_rows
+
+        elif case == "get_results":
+            start = time.perf_counter()
+            df = core.get_results(str(event_id))
+            result["seconds"] = time.perf_counter() - start
+            result["rows"] = len(df)
+
+    result["peak_rss_mb"] = _peak_rss_mb()
+    queue.put(result)
+
+def _wait_for_result(proc, queue, timeout):
+    """
+    Returns the case's result dict, or None if its process died or ran past
+    timeout seconds (it is killed then) without reporting one.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except queue_module.Empty:
+            if not proc.is_alive():
+                # The result may have landed just before the process exited.
+                try:
+                    return queue.get(timeout=1)
+                except queue_module.Empty:
+                    return None
+            if time.monotonic() > deadline:
+                proc.terminate()
+                return None
+
+def run_benchmark(sizes, latency=0.0, error_rate=0.0, cases=CASES, timeout=CASE_TIMEOUT):
+    """
+    Runs every case for every event size. Returns a list of result dicts.
+    A case whose process crashes or times out is reported and skipped.
+    """
+    ctx = mp.get_context("spawn")
+    results = []
+    for size in sizes:
+        with run_mock_server(results=size, latency=latency, error_rate=error_rate) as server:
+            for case in cases:
+                queue = ctx.Queue()
+                proc = ctx.Process(target=_run_case, args=(case, server.url, 1000 + size, size, queue))
+                proc.start()
+                result = _wait_for_result(proc, queue, timeout)
+                proc.join()
+                if result is None:
+                    print(f"{size:>8} {case:<14} failed (exit code {proc.exitcode})")
+                    continue
+
+                result["size"] = size
+                seconds = result["seconds"] or 1e-9
+                result["rows_per_sec"] = result["rows"] / seconds
+                if "pages" in result:
+                    result["pages_per_sec"] = result["pages"] / seconds
+                results.append(result)
+                _print_row(result)
+    return results
+
+def _print_row(r):
+    pages = f"{r['pages_per_sec']:10.1f}" if "pages_per_sec" in r else f"{'-':>10}"
+    print(f"{r['size']:>8} {r['case']:<14} {r['seconds']:9.3f} {pages} {r['rows_per_sec']:12.0f} {r['peak_rss_mb']:10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper throughput against a local mock API.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Finishers per event.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of simulated latency per request.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--timeout", type=float, default=CASE_TIMEOUT, help="Seconds before a case is killed.")
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'case':<14} {'seconds':>9} {'pages/s':>10} {'rows/s':>12} {'peak MB':>10}")
+    results = run_benchmark(args.sizes, args.latency, args.error_rate, args.cases, args.timeout)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
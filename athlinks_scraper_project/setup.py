@@ -9,7 +9,11 @@ setup(
     install_requires=[
         "requests",
         "pandas",
+        "pyarrow",
     ],
+    extras_require={
+        "fast": ["msgspec", "orjson"],
+    },
     entry_points={
         "console_scripts": [
             "athlinks-scraper=athlinks_scraper.cli:main",
@@ -0,0 +1,45 @@
+import pytest
+
+from athlinks_scraper import core
+from athlinks_scraper.cache import ResponseCache
+from athlinks_scraper.core import configure_client
+from athlinks_scraper.mock_api import start_mock_server
+
+@pytest.fixture
+def mock_api(tmp_path):
+    """
+    Starts the mock API with the given MockOptions and points the shared
+    client at it, with a fresh response cache that never serves results
+    pages (so a test sees the data as it is now). Returns the server; its
+    options can be changed between requests via server.options.
+    """
+    servers = []
+
+    def start(cache_ttls=None, **options):
+        server = start_mock_server(**options)
+        server.options = server.RequestHandlerClass.options
+        servers.append(server)
+        cache = ResponseCache(str(tmp_path / "cache"), ttls=dict({"results": 0}, **(cache_ttls or {})))
+        configure_client(base_url=server.url, cache=cache, rate_limit=None)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+    configure_client()
+
+@pytest.fixture
+def page_requests(monkeypatch):
+    """
+    Records the offset of every results page requested.
+    """
+    offsets = []
+    fetch_page = core._fetch_results_page
+
+    def counting(client, event_id, offset, *args, **kwargs):
+        offsets.append(offset)
+        return fetch_page(client, event_id, offset, *args, **kwargs)
+
+    monkeypatch.setattr(core, "_fetch_results_page", counting)
+    return offsets
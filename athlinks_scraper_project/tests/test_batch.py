@@ -0,0 +1,23 @@
+from athlinks_scraper.batch import resolve_batch, resolve_target
+
+def test_resolve_target():
+    assert resolve_target("https://www.athlinks.com/event/1234/results/Event/123401/Results") == ('event', '123401')
+    assert resolve_target("https://www.athlinks.com/event/1234") == ('master', '1234')
+    assert resolve_target("123401") == ('event', '123401')
+    assert resolve_target("not a race") is None
+
+def test_resolve_batch_scrapes_each_event_once(mock_api):
+    mock_api(events=3)
+    lines = [
+        "123401",
+        "https://www.athlinks.com/event/1234/results/Event/123401/Results",
+        "https://www.athlinks.com/event/1234",
+        "https://www.athlinks.com/event/1234",
+        "not a race",
+    ]
+    events, unresolved = resolve_batch(lines, all_years=True)
+
+    assert sorted(str(e['id']) for e in events) == ["123400", "123401", "123402"]
+    # The event listed by ID keeps its place at the front.
+    assert str(events[0]['id']) == "123401"
+    assert unresolved == ["not a race"]
@@ -0,0 +1,38 @@
+import os
+import time
+
+import pytest
+
+from athlinks_scraper.cache import OfflineCacheMiss, ResponseCache
+from athlinks_scraper.core import configure_client, fetch_master_events
+
+URL = "https://example.test/event/1/results"
+
+def test_entries_expire_after_their_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put(URL, {"from": 0}, b"page")
+    assert cache.get(URL, {"from": 0}, ttl=60) == b"page"
+    assert cache.get(URL, {"from": 100}, ttl=60) is None
+
+    # Age the entry past its TTL; None means any age is fine (immutable results).
+    path = cache._path(cache.key(URL, {"from": 0}))
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert cache.get(URL, {"from": 0}, ttl=60) is None
+    assert cache.get(URL, {"from": 0}, ttl=None) == b"page"
+    assert ResponseCache(str(tmp_path), offline=True).get(URL, {"from": 0}, ttl=60) == b"page"
+
+def test_offline_mode_replays_the_cache(tmp_path, mock_api):
+    server = mock_api(events=3)
+    online = fetch_master_events(1234)
+    assert len(online) == 3
+
+    server.shutdown()
+    configure_client(base_url=server.url, cache=ResponseCache(str(tmp_path / "cache"), offline=True))
+    assert fetch_master_events(1234) == online
+
+def test_offline_mode_never_touches_the_network(tmp_path, mock_api):
+    server = mock_api()
+    client = configure_client(base_url=server.url, cache=ResponseCache(str(tmp_path / "empty"), offline=True))
+    with pytest.raises(OfflineCacheMiss):
+        client.get_json("/event/1/metadata")
@@ -0,0 +1,28 @@
+from athlinks_scraper import cli
+from athlinks_scraper.catalog import EventCatalog, load_master_events
+from athlinks_scraper.core import fetch_metadata
+from athlinks_scraper.manifest import ScrapeManifest
+
+MASTER_ID = 1234
+
+def test_catalog_hit_keeps_metadata_and_follows_the_manifest(tmp_path, monkeypatch, mock_api):
+    mock_api(results=150, events=2)
+    out = str(tmp_path)
+    manifest = ScrapeManifest.for_directory(out)
+    events = load_master_events(MASTER_ID, catalog=EventCatalog.for_directory(out), manifest=manifest)
+    assert [e['expected_pages'] for e in events] == [None, None]
+
+    # A scrape saves the first event; the catalog's estimate picks that up.
+    event_id = events[0]['id']
+    path = tmp_path / "event.csv"
+    path.write_text("a\n1\n")
+    manifest.record(event_id, str(path), 150, event_date=events[0]['date_str'])
+    cached = load_master_events(MASTER_ID, catalog=EventCatalog.for_directory(out), manifest=manifest)
+    assert [e['expected_pages'] for e in cached] == [2, None]
+    assert cached[0]['metadata'] == fetch_metadata(event_id)
+
+    # Scraping from a catalog hit doesn't fetch the metadata again.
+    def no_metadata(event_id, client=None):
+        raise AssertionError("metadata fetched again")
+    monkeypatch.setattr(cli, "fetch_metadata", no_metadata)
+    assert cli.process_event(event_id, out, manifest=manifest, fmt="csv", metadata=cached[0]['metadata']) == 150
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pyarrow.parquet as pq
+import pytest
+
+from athlinks_scraper import cli, core
+from athlinks_scraper.checkpoint import ScrapeCheckpoint
+from athlinks_scraper.core import fetch_metadata
+from athlinks_scraper.writers import write_event
+
+EVENT_ID = 123456
+
+def test_resume_continues_from_the_checkpoint(tmp_path, monkeypatch, mock_api, page_requests):
+    mock_api(results=500)
+    path = str(tmp_path / "event.parquet")
+    metadata = fetch_metadata(EVENT_ID)
+    checkpoint = ScrapeCheckpoint(str(tmp_path / ".checkpoints"), EVENT_ID)
+
+    # The connection drops while the page at offset 300 is being fetched.
+    fetch_page = core._fetch_results_page
+    def failing(client, event_id, offset, *args, **kwargs):
+        if offset == 300:
+            raise ConnectionError("connection reset")
+        return fetch_page(client, event_id, offset, *args, **kwargs)
+    monkeypatch.setattr(core, "_fetch_results_page", failing)
+    with pytest.raises(ConnectionError):
+        write_event(EVENT_ID, path, "parquet", metadata, checkpoint=checkpoint)
+    assert not os.path.exists(path)
+    assert checkpoint.next_offset == 300
+
+    monkeypatch.setattr(core, "_fetch_results_page", fetch_page)
+    page_requests.clear()
+    resumed = ScrapeCheckpoint(str(tmp_path / ".checkpoints"), EVENT_ID)
+    assert write_event(EVENT_ID, path, "parquet", metadata, checkpoint=resumed, resume=True) == 500
+
+    # Only the pages after the checkpoint were fetched again, and every row is there once.
+    assert min(page_requests) == 300
+    ranks = pq.read_table(path).column("Overall Rank").to_pylist()
+    assert sorted(ranks) == list(range(1, 501))
+    assert not os.path.exists(resumed.dir)
+
+def _run_failing_cli(monkeypatch, out, url, *args):
+    fetch_page = core._fetch_results_page
+    def failing(client, event_id, offset, *a, **kwargs):
+        if offset == 100:
+            raise ConnectionError("connection reset")
+        return fetch_page(client, event_id, offset, *a, **kwargs)
+    monkeypatch.setattr(core, "_fetch_results_page", failing)
+    monkeypatch.setattr(sys, "argv", ["athlinks-scraper", str(EVENT_ID), "--output-dir", out, "--api-base", url,
+                                      "--no-cache", "--rate-limit", "0", *args])
+    with pytest.raises(SystemExit):
+        cli.main()
+
+def test_cli_checkpoints_only_with_resume(tmp_path, monkeypatch, mock_api):
+    server = mock_api(results=300)
+    out = str(tmp_path / "out")
+    _run_failing_cli(monkeypatch, out, server.url)
+    assert not os.path.exists(os.path.join(out, ".checkpoints"))
+
+    _run_failing_cli(monkeypatch, out, server.url, "--resume")
+    assert ScrapeCheckpoint(os.path.join(out, ".checkpoints"), EVENT_ID).load() == 100
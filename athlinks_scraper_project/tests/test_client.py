@@ -0,0 +1,49 @@
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+from athlinks_scraper.core import MAX_RETRY_AFTER, AdaptiveConcurrency, configure_client, fetch_results, get_client, parse_retry_after
+
+EVENT_ID = 123456
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("100000") == MAX_RETRY_AFTER
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= parse_retry_after(in_a_minute) <= 60
+
+def test_retries_after_throttling_honour_retry_after(mock_api):
+    server = mock_api(results=50, throttle_rate=1.0, retry_after=1)
+    configure_client(base_url=server.url, rate_limit=None, backoff=0.01)
+    # The API stops throttling well before the Retry-After it sent has passed.
+    threading.Timer(0.3, lambda: setattr(server.options, "throttle_rate", 0.0)).start()
+
+    started = time.monotonic()
+    blocks = fetch_results(EVENT_ID)
+    assert time.monotonic() - started >= 1.0
+    assert sum(len(i['results']) for block in blocks for i in block['intervals']) == 50
+    # A 429 halves the in-flight limit.
+    assert get_client().concurrency.state()['decreases'] >= 1
+
+def test_gives_up_after_max_retries(mock_api):
+    server = mock_api(results=50, error_rate=1.0)
+    configure_client(base_url=server.url, rate_limit=None, backoff=0.01, max_retries=2)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        fetch_results(EVENT_ID)
+
+def test_latency_baseline_creeps_once_per_window():
+    limiter = AdaptiveConcurrency(window=20)
+    for latency in [0.1] * 20 + [0.15] * 60:
+        limiter.acquire()
+        limiter.release(latency)
+
+    # Three windows of slower responses move the baseline 5% each, not 5% per response.
+    assert limiter.baseline == pytest.approx(0.1 * 1.05 ** 3)
+    assert limiter.decreases == 0
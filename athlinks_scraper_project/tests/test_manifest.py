@@ -0,0 +1,49 @@
+import os
+import sys
+from datetime import date, timedelta
+
+from athlinks_scraper import cli
+from athlinks_scraper.manifest import ScrapeManifest
+
+MASTER_ID = 1234
+
+def test_needs_scrape(tmp_path):
+    manifest = ScrapeManifest.for_directory(str(tmp_path))
+    path = tmp_path / "event.csv"
+    path.write_text("a\n1\n")
+    assert manifest.needs_scrape(1)
+
+    manifest.record(1, str(path), 1, event_date="2019-11-28")
+    assert not manifest.needs_scrape(1)
+    # The manifest survives a reload.
+    assert not ScrapeManifest.for_directory(str(tmp_path)).needs_scrape(1)
+
+    # Results may still change shortly after the race.
+    manifest.record(2, str(path), 1, event_date=(date.today() - timedelta(days=2)).isoformat())
+    assert manifest.needs_scrape(2)
+
+    # A changed or missing file is scraped again.
+    path.write_text("a\n2\n")
+    assert manifest.needs_scrape(1)
+    os.remove(path)
+    assert manifest.needs_scrape(1)
+
+def _run_cli(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["athlinks-scraper", *args])
+    cli.main()
+
+def test_incremental_skips_saved_final_events(tmp_path, monkeypatch, capsys, mock_api, page_requests):
+    server = mock_api(results=120, events=3)
+    out = str(tmp_path / "out")
+    args = (f"https://www.athlinks.com/event/{MASTER_ID}", "--all-years", "--incremental",
+            "--output-dir", out, "--api-base", server.url, "--no-cache", "--rate-limit", "0")
+
+    _run_cli(monkeypatch, *args)
+    assert len(ScrapeManifest.for_directory(out).events) == 3
+    fetched = len(page_requests)
+    # Two pages each, plus the empty one that shows where an event never scraped before ends.
+    assert fetched == 9
+
+    _run_cli(monkeypatch, *args)
+    assert "Skipping 3 events" in capsys.readouterr().out
+    assert len(page_requests) == fetched
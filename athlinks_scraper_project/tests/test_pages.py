@@ -0,0 +1,33 @@
+from athlinks_scraper.catalog import expected_pages
+from athlinks_scraper.core import fetch_metadata, fetch_results
+from athlinks_scraper.writers import write_event
+
+EVENT_ID = 123456
+
+def _count_results(blocks):
+    return sum(len(i['results']) for block in blocks for i in block['intervals'])
+
+def test_expected_pages_stops_read_ahead_at_the_end(mock_api, page_requests):
+    mock_api(results=3050)
+    blocks = fetch_results(EVENT_ID, expected_pages=31)
+
+    assert _count_results(blocks) == 3050
+    assert sorted(page_requests) == list(range(0, 3100, 100))
+
+def test_low_estimate_still_reads_every_page(mock_api, page_requests):
+    mock_api(results=1000)
+    blocks = fetch_results(EVENT_ID, expected_pages=3)
+
+    assert _count_results(blocks) == 1000
+    # Past the estimate pages are fetched one at a time, ending on the first empty one.
+    assert sorted(page_requests) == list(range(0, 1100, 100))
+
+def test_write_event_stops_at_the_expected_pages(tmp_path, mock_api, page_requests):
+    mock_api(results=150)
+    # An earlier scrape saved 150 rows, so the event should end on its second page.
+    pages = expected_pages({'rows': 150})
+    rows = write_event(EVENT_ID, str(tmp_path / "event.parquet"), "parquet", fetch_metadata(EVENT_ID),
+                       expected_pages=pages)
+
+    assert rows == 150
+    assert sorted(page_requests) == [0, 100]
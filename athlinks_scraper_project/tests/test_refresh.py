@@ -0,0 +1,59 @@
+import os
+
+import pyarrow.parquet as pq
+
+from athlinks_scraper.checkpoint import PageStore
+from athlinks_scraper.core import fetch_metadata
+from athlinks_scraper.manifest import ScrapeManifest
+from athlinks_scraper.writers import page_part_path, page_parts, refresh_event, write_event
+
+EVENT_ID = 123456
+
+def _stamps(paths):
+    return {os.path.basename(path): os.stat(path).st_mtime_ns for path in paths}
+
+def test_partitioned_refresh_writes_only_changed_pages(tmp_path, mock_api):
+    server = mock_api(results=250)
+    path = str(tmp_path / "master_id=1234" / "year=2025" / f"part-{EVENT_ID}.parquet")
+    store = PageStore(str(tmp_path / ".pages"), EVENT_ID)
+    metadata = fetch_metadata(EVENT_ID)
+
+    assert refresh_event(EVENT_ID, path, "parquet", store, metadata, partitioned=True) == (250, 3)
+    assert page_parts(path) == [page_part_path(path, offset) for offset in (0, 100, 200)]
+    assert not os.path.exists(path)
+    before = _stamps(page_parts(path))
+
+    # Finishers are added on the last page only.
+    server.options.results = 280
+    assert refresh_event(EVENT_ID, path, "parquet", store, metadata, partitioned=True) == (280, 1)
+    after = _stamps(page_parts(path))
+    assert {name for name in after if after[name] != before[name]} == {f"part-{EVENT_ID}-page000000200.parquet"}
+    assert sum(pq.ParquetFile(part).metadata.num_rows for part in page_parts(path)) == 280
+
+    # The event gets shorter: the dropped page's part goes with it.
+    server.options.results = 150
+    assert refresh_event(EVENT_ID, path, "parquet", store, metadata, partitioned=True) == (150, 2)
+    assert page_parts(path) == [page_part_path(path, offset) for offset in (0, 100)]
+
+    # The manifest covers every part; a full scrape replaces them with one file.
+    manifest = ScrapeManifest.for_directory(str(tmp_path))
+    manifest.record(EVENT_ID, path, 150, event_date="2019-11-28", parts=page_parts(path))
+    assert not manifest.needs_scrape(EVENT_ID)
+    assert write_event(EVENT_ID, path, "parquet", metadata) == 150
+    assert page_parts(path) == []
+    assert manifest.needs_scrape(EVENT_ID)
+
+def test_single_file_refresh_rewrites_on_change(tmp_path, mock_api):
+    server = mock_api(results=150)
+    path = str(tmp_path / "event.csv")
+    store = PageStore(str(tmp_path / ".pages"), EVENT_ID)
+    metadata = fetch_metadata(EVENT_ID)
+
+    assert refresh_event(EVENT_ID, path, "csv", store, metadata) == (150, 2)
+    stamp = os.stat(path).st_mtime_ns
+    assert refresh_event(EVENT_ID, path, "csv", store, metadata) == (150, 0)
+    assert os.stat(path).st_mtime_ns == stamp
+
+    server.options.results = 180
+    assert refresh_event(EVENT_ID, path, "csv", store, metadata) == (180, 1)
+    assert os.stat(path).st_mtime_ns != stamp
@@ -0,0 +1,86 @@
+import glob
+import os
+
+import pyarrow.parquet as pq
+
+from athlinks_scraper.core import describe_event, fetch_metadata
+from athlinks_scraper.tail import EventTail, poll_new_results, tail_event
+from athlinks_scraper.writers import partition_path, write_event
+
+EVENT_ID = 123456
+
+def _part_files(data_dir):
+    return sorted(glob.glob(os.path.join(data_dir, "master_id=*", "year=*", "*.parquet")))
+
+def test_tail_keeps_every_course_and_interval(tmp_path, mock_api):
+    data_dir = str(tmp_path / "data")
+    server = mock_api(results=150, courses=3, intervals=2)
+    assert tail_event(EVENT_ID, data_dir, interval=0, max_polls=1) == 900
+
+    # More finishers arrive on every course and interval.
+    server.options.results = 250
+    assert tail_event(EVENT_ID, data_dir, interval=0, max_polls=1) == 1500
+
+    # Nothing new: nothing appended.
+    assert tail_event(EVENT_ID, data_dir, interval=0, max_polls=1) == 1500
+
+    files = _part_files(data_dir)
+    assert [os.path.basename(f) for f in files] == [f"part-{EVENT_ID}.parquet"]
+    table = pq.read_table(files[0])
+    assert table.num_rows == 1500
+    per_course = table.group_by("Race Type").aggregate([("Bib", "count")]).to_pydict()
+    assert dict(zip(per_course["Race Type"], per_course["Bib_count"])) == {"5K": 500, "5 Mile": 500, "Kids Fun Run": 500}
+    # Every finisher of every interval exactly once.
+    ranks = table.group_by(["Race Type", "Overall Rank"]).aggregate([("Bib", "count")]).column("Bib_count").to_pylist()
+    assert len(ranks) == 750 and set(ranks) == {2}
+
+def test_tail_replaces_part_file_without_tail_state(tmp_path, mock_api):
+    data_dir = str(tmp_path / "data")
+    mock_api(results=120, courses=2)
+    tail_event(EVENT_ID, data_dir, interval=0, max_polls=1)
+    # A part file without matching tail state (e.g. from a normal scrape) is read again, not appended to.
+    os.remove(os.path.join(data_dir, ".tail", f"{EVENT_ID}.json"))
+    assert tail_event(EVENT_ID, data_dir, interval=0, max_polls=1) == 240
+
+    assert pq.read_table(_part_files(data_dir)[0]).num_rows == 240
+
+def _ingested_rows(data_dir):
+    # What the dashboard ingests: every Parquet file outside hidden directories.
+    rows = 0
+    for dirpath, dirnames, filenames in os.walk(data_dir):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        rows += sum(pq.ParquetFile(os.path.join(dirpath, f)).metadata.num_rows
+                    for f in filenames if f.endswith(".parquet"))
+    return rows
+
+def test_retailing_a_scraped_event_never_double_counts(tmp_path, mock_api):
+    data_dir = str(tmp_path / "data")
+    mock_api(results=300)
+    metadata = fetch_metadata(EVENT_ID)
+    part_path = partition_path(data_dir, metadata['masterId'], describe_event(metadata)[2], EVENT_ID)
+    assert write_event(EVENT_ID, part_path, "parquet", metadata) == 300
+
+    tail = EventTail(part_path, EVENT_ID, os.path.join(data_dir, ".tail"))
+    tail.append(*poll_new_results(EVENT_ID, tail, describe_event(metadata)))
+    # Before compaction the segments hold the event and the old part file is out of the way.
+    assert _ingested_rows(data_dir) == 300
+
+    # A tail that stops (or dies) here and is restarted still counts every finisher once.
+    tail = EventTail(part_path, EVENT_ID, os.path.join(data_dir, ".tail"))
+    assert _ingested_rows(data_dir) == 300
+    tail.compact()
+    assert _ingested_rows(data_dir) == 300
+    assert [os.path.basename(f) for f in _part_files(data_dir)] == [f"part-{EVENT_ID}.parquet"]
+    assert not os.path.exists(tail.replaced_path)
+
+def test_tail_without_new_results_restores_the_part_file(tmp_path, mock_api):
+    data_dir = str(tmp_path / "data")
+    mock_api(results=50)
+    metadata = fetch_metadata(EVENT_ID)
+    part_path = partition_path(data_dir, metadata['masterId'], describe_event(metadata)[2], EVENT_ID)
+    write_event(EVENT_ID, part_path, "parquet", metadata)
+
+    tail = EventTail(part_path, EVENT_ID, os.path.join(data_dir, ".tail"))
+    assert _ingested_rows(data_dir) == 0
+    tail.compact()
+    assert _ingested_rows(data_dir) == 50
@@ -0,0 +1,43 @@
+import glob
+import os
+
+import pyarrow.parquet as pq
+
+from athlinks_scraper import watch as watch_module
+from athlinks_scraper.watch import DONE, PENDING, WatchState, watch
+
+MASTER_ID = "1234"
+EVENT_ID = "123400"
+
+def _rows(data_dir):
+    return sum(pq.ParquetFile(f).metadata.num_rows
+               for f in glob.glob(os.path.join(data_dir, "master_id=*", "year=*", "*.parquet")))
+
+def _status(data_dir):
+    return WatchState(os.path.join(data_dir, watch_module.STATE_NAME)).events(MASTER_ID)[EVENT_ID]
+
+def test_open_event_is_refreshed_until_final(tmp_path, monkeypatch, mock_api, page_requests):
+    data_dir = str(tmp_path / "data")
+    server = mock_api(results=100, events=1)
+    final = False
+    monkeypatch.setattr(watch_module, "is_event_final", lambda metadata: final)
+
+    watch([MASTER_ID], data_dir, once=True)
+    assert _rows(data_dir) == 100
+    assert _status(data_dir) == {**_status(data_dir), 'status': PENDING, 'rows': 100}
+
+    # More finishers are posted before the results are final.
+    server.options.results = 250
+    watch([MASTER_ID], data_dir, once=True)
+    assert _rows(data_dir) == 250
+    assert _status(data_dir)['status'] == PENDING
+
+    final = True
+    watch([MASTER_ID], data_dir, once=True)
+    assert _rows(data_dir) == 250
+    assert _status(data_dir) == {**_status(data_dir), 'status': DONE, 'rows': 250}
+
+    # A done event is not fetched again.
+    requested = len(page_requests)
+    watch([MASTER_ID], data_dir, once=True)
+    assert len(page_requests) == requested
@@ -3,17 +3,37 @@ import pandas as pd
 import plotly.express as px
 import sys
 import os
+import time
+import uuid
 
 # Ensure athlinks_scraper is importable
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'athlinks_scraper_project'))
 
-from athlinks_scraper.core import get_results, extract_master_id, extract_event_id, fetch_master_events, fetch_metadata
-from athlinks_scraper.core import get_results, extract_master_id, extract_event_id, fetch_master_events, fetch_metadata
-from dashboard_queries import init_db, get_event_names, create_enriched_view, get_overview_stats, get_pace_partners, get_fun_stats, get_distribution, get_trends, get_runner_history, get_nemesis, get_retention_data, get_fastest_by_year, get_fastest_by_demographics, get_division_stats, get_era_stats, get_raw_times, get_avg_annual_runners, save_custom_event_name, get_competitiveness_stats
+from athlinks_scraper.core import extract_master_id, extract_event_id, fetch_master_events, fetch_metadata
+from athlinks_scraper.core import configure_client, get_client
+from athlinks_scraper.cache import ResponseCache
+from athlinks_scraper.jobs import run_events
+from athlinks_scraper.manifest import ScrapeManifest
+from athlinks_scraper.writers import migrate_flat_files, partition_path, write_event
+import dashboard_queries
+from dashboard_queries import init_db, refresh_db, build_warehouse, open_warehouse, ingest_requested, get_data_version, get_event_names, get_race_context, create_enriched_view, get_overview_stats, get_pace_partners, get_fun_stats, get_distribution, get_trends, get_runner_history, get_nemesis, get_retention_data, get_fastest_by_year, get_fastest_by_demographics, get_division_stats, get_era_stats, get_raw_times, get_avg_annual_runners, save_custom_event_name, get_competitiveness_stats
 import plotly.graph_objects as go
 
 st.set_page_config(page_title="Athlinks Race Analytics", layout="wide")
 
+# Number of years scraped concurrently by "Scrape All Years"
+SCRAPE_JOBS = 4
+
+# Seconds between reruns while "Live refresh" is on
+LIVE_REFRESH_SECONDS = 10
+
+# Query results kept across reruns and sessions (least recently used are evicted first)
+QUERY_CACHE_ENTRIES = 256
+
+# Re-scrapes of finished races are served from the on-disk response cache
+if get_client().cache is None:
+    configure_client(cache=ResponseCache())
+
 # --- Custom CSS for Editorial Vibe ---
 st.markdown("""
     <style>
@@ -126,10 +146,45 @@ def display_chart(fig):
     fig = style_chart(fig)
     st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False, 'scrollZoom': False})
 
+# --- Caching ---
+@st.cache_resource(show_spinner=False)
+def get_shared_connection():
+    """
+    The one warehouse connection of the app process. Sessions query through
+    their own cursor of it and new files are ingested through it in place,
+    so it lives as long as the app.
+    """
+    return open_warehouse()
+
+@st.cache_data(max_entries=QUERY_CACHE_ENTRIES, show_spinner=False)
+def cached_query(_con, _race, data_version, master_id, query_name, *args, **kwargs):
+    """
+    Runs dashboard_queries.<query_name> on _con, whose results_enriched view
+    must already be filtered to master_id (_race being its RaceContext).
+    Keyed by data version, master ID and query parameters, so changing one
+    widget only re-runs its own query.
+    """
+    return getattr(dashboard_queries, query_name)(_con, _race, *args, **kwargs)
+
+@st.cache_data(max_entries=QUERY_CACHE_ENTRIES, show_spinner=False)
+def cached_race_context(_con, data_version, master_id):
+    return get_race_context(_con, master_id)
+
+@st.cache_data(max_entries=QUERY_CACHE_ENTRIES, show_spinner=False)
+def cached_event_names(_con, data_version):
+    return get_event_names(_con)
+
+def query(func, *args, **kwargs):
+    """
+    Cached call of a dashboard_queries get_* function for the current data and race.
+    """
+    return cached_query(con, race, data_version, selected_master_id, func.__name__, *args, **kwargs)
+
 # --- Sidebar ---
 with st.sidebar:
     st.header("Data Management")
     uploaded_files = st.file_uploader("Upload CSV Results", accept_multiple_files=True, type="csv")
+    live_refresh = st.checkbox("Live refresh", help="Reload new finishers every few seconds, e.g. while `athlinks-scraper tail` is running.")
     
     st.divider()
     
@@ -177,23 +232,36 @@ with st.sidebar:
                         st.info(f"Found Master ID: {master_id}. Fetching events...")
                         events = fetch_master_events(master_id)
                         
+                        # Only scrape years that are missing or whose results may still change
+                        data_dir = os.path.join(os.path.dirname(__file__), "data")
+                        manifest = ScrapeManifest.for_directory(data_dir)
+                        migrate_flat_files(data_dir, manifest)
+                        events = [e for e in events if manifest.needs_scrape(e['id'])]
+                        
                         progress_bar = st.progress(0)
                         status_text = st.empty()
+                        status_text.text(f"Scraping {len(events)} years...")
+                        
+                        def scrape_year(event):
+                            # Save to data/master_id=.../year=.../
+                            filename = partition_path(data_dir, master_id, event['date_str'], event['id'])
+                            rows = write_event(event['id'], filename, "parquet", fetch_metadata(event['id']))
+                            if rows:
+                                manifest.record(event['id'], filename, rows, event_date=event['date_str'], master_id=master_id)
+                            return rows
                         
-                        for i, event in enumerate(events):
-                            year = event['date_str'][:4]
-                            event_id = event['id']
-                            status_text.text(f"Scraping {year}...")
-                            
-                            df = get_results(event_id)
-                            if not df.empty:
-                                # Save to data/
-                                filename = os.path.join(os.path.dirname(__file__), "data", f"scraped_{master_id}_{year}.parquet")
-                                os.makedirs(os.path.dirname(filename), exist_ok=True)
-                                df.to_parquet(filename, index=False)
-                            
-                            progress_bar.progress((i + 1) / len(events))
+                        finished = []
+                        def on_year_done(event, rows, error):
+                            finished.append(event)
+                            status_text.text(f"Scraped {event['date_str'][:4]}")
+                            progress_bar.progress(len(finished) / len(events))
                         
+                        report = run_events(events, scrape_year, jobs=SCRAPE_JOBS, on_done=on_year_done)
+                        if report.failed:
+                            st.warning(report.summary())
+                        
+                        # Ingest the new files into the warehouse the app reads from
+                        build_warehouse(data_dir, con=get_shared_connection())
                         st.success("Scraping Complete! Refreshing...")
                         st.rerun()
                     else:
@@ -214,11 +282,31 @@ if not uploaded_files and not has_local_data:
     st.info("Please upload race result CSV files or scrape a Master Event to begin.")
     st.stop()
 
-# Initialize Database
-con = init_db(uploaded_files)
+# Ingest files written outside the app (CLI scrapes, `athlinks-scraper tail`) into the warehouse.
+# Only done when a session starts, live refresh is on or restore_data.py asked for it
+# (it can't write the warehouse while the app holds it); a no-op when nothing changed.
+shared_con = get_shared_connection()
+if "warehouse_checked" not in st.session_state or live_refresh or ingest_requested(data_dir):
+    # Flat files from older versions move into the partitions first, so a year is never ingested twice
+    if "warehouse_checked" not in st.session_state:
+        migrate_flat_files(data_dir, ScrapeManifest.for_directory(data_dir))
+    build_warehouse(data_dir, con=shared_con)
+    st.session_state.warehouse_checked = True
+
+# Each session keeps its own cursor of the shared connection, holding its uploads
+# and results_enriched view; reruns only load new uploads
+if "con" not in st.session_state:
+    st.session_state.con = init_db(uploaded_files, shared_con)
+    st.session_state.session_key = uuid.uuid4().hex
+else:
+    refresh_db(st.session_state.con, uploaded_files)
+con = st.session_state.con
+# Uploads are private to the session, so are query results computed over them
+session_key = st.session_state.session_key if uploaded_files else ""
 
 # Get available events
-events = get_event_names(con)
+data_version = f"{get_data_version(con)}|{session_key}"
+events = cached_event_names(con, data_version)
 selected_master_id = None
 
 if events:
@@ -239,11 +327,15 @@ if events:
         if st.button("Save Name"):
             if new_name and new_name != selected_name:
                 save_custom_event_name(selected_master_id, new_name)
+                cached_event_names.clear()
                 st.success("Name saved!")
                 st.rerun()
 
-# Create the view based on selection
+# Create the view based on selection and resolve its primary race, years and counts once
 create_enriched_view(con, selected_master_id)
+# Only changes when this race's rows do, so ingesting other races keeps its cached results
+data_version = f"{get_data_version(con, selected_master_id)}|{session_key}"
+race = cached_race_context(con, data_version, selected_master_id)
 
 # --- Hero Header ---
 with st.container():
@@ -257,7 +349,7 @@ tab1, tab2, tab3, tab4 = st.tabs(["Analytics & Trends", "Runner Tools", "Hall of
 with tab1:
     # --- Overview Stats ---
     st.header("Race Overview")
-    stats = get_overview_stats(con)
+    stats = query(get_overview_stats)
 
     if not stats.empty:
         # Extract values safely
@@ -305,7 +397,7 @@ with tab1:
     </div>
     """, unsafe_allow_html=True)
     
-    trends = get_trends(con)
+    trends = query(get_trends)
     if not trends.empty and len(trends) > 1:
 
         # Toggle for Plot Metric
@@ -387,7 +479,7 @@ with tab1:
     </div>
     """, unsafe_allow_html=True)
     
-    dist_df = get_distribution(con)
+    dist_df = query(get_distribution)
     
     if not dist_df.empty:
         # 1. Calculate Statistics for Context
@@ -455,7 +547,7 @@ with tab1:
         comp_age = st.slider("Age Range", 0, 100, (0, 100), key="comp_age")
 
     with col_comp2:
-        comp_stats = get_competitiveness_stats(con, gender=comp_gender, age_min=comp_age[0], age_max=comp_age[1])
+        comp_stats = query(get_competitiveness_stats, gender=comp_gender, age_min=comp_age[0], age_max=comp_age[1])
         
         if not comp_stats.empty:
             # Convert seconds to datetime for proper formatting
@@ -504,7 +596,7 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
         
-        div_stats = get_division_stats(con)
+        div_stats = query(get_division_stats)
         if not div_stats.empty:
             # Highlight Most Competitive
             most_competitive = div_stats.sort_values("top_3_spread_seconds").iloc[0]
@@ -536,7 +628,7 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
         
-        era_stats = get_era_stats(con)
+        era_stats = query(get_era_stats)
         if not era_stats.empty:
             # Format metrics
             era_stats["Avg Runners"] = era_stats["avg_runners_per_year"].astype(int)
@@ -561,7 +653,7 @@ with tab2:
     
     runner_name = st.text_input("Search for a Runner by Name")
     if runner_name:
-        history = get_runner_history(con, runner_name)
+        history = query(get_runner_history, runner_name)
         if not history.empty:
             st.success(f"Found {len(history)} results for '{runner_name}'")
             st.dataframe(history, use_container_width=True)
@@ -580,7 +672,7 @@ with tab2:
     
     rival_search_name = st.text_input("Enter Your Name for Rivalry Check")
     if rival_search_name:
-        rivals = get_nemesis(con, rival_search_name)
+        rivals = query(get_nemesis, rival_search_name)
         if not rivals.empty:
             # Format Avg Time Diff
             rivals["Avg Time Diff"] = rivals["Avg_Time_Diff_Seconds"].apply(
@@ -612,7 +704,7 @@ with tab2:
     with col2:
         if target_input:
             try:
-                partners = get_pace_partners(con, target_input, tolerance, search_type)
+                partners = query(get_pace_partners, target_input, tolerance, search_type)
                 if not partners.empty:
                     st.dataframe(partners, use_container_width=True)
                 else:
@@ -632,7 +724,7 @@ with tab3:
     
     with col1:
         st.subheader("Fastest Overall by Year")
-        fastest_year = get_fastest_by_year(con)
+        fastest_year = query(get_fastest_by_year)
         if not fastest_year.empty:
             st.dataframe(fastest_year[["event_year", "Name", "Time", "Pace"]], use_container_width=True)
         else:
@@ -640,7 +732,7 @@ with tab3:
             
     with col2:
         st.subheader("All-Time Records by Age Group")
-        fastest_demo = get_fastest_by_demographics(con)
+        fastest_demo = query(get_fastest_by_demographics)
         if not fastest_demo.empty:
             st.dataframe(fastest_demo[["Gender", "Age_Group", "Name", "Time", "event_year"]], use_container_width=True)
         else:
@@ -652,7 +744,7 @@ with tab3:
     st.header("Fun Stats")
     
     st.subheader("Frequent Flyers (Most Races)")
-    hof = get_fun_stats(con)
+    hof = query(get_fun_stats)
     if not hof.empty:
         hof = hof.rename(columns={"race_count": "Races Run", "best_pace": "Best Pace"})
         st.dataframe(hof, use_container_width=True)
@@ -692,7 +784,7 @@ with tab4:
                 st.error("Invalid numbers.")
 
     if target_seconds:
-        raw_times = get_raw_times(con)
+        raw_times = query(get_raw_times)
         
         # Apply Filters
         if not raw_times.empty:
@@ -741,7 +833,7 @@ with tab4:
             
             # Check history to expand smart defaults if needed
             if runner_history_name:
-                 history_df = get_runner_history(con, runner_history_name)
+                 history_df = query(get_runner_history, runner_history_name)
                  if not history_df.empty:
                      smart_max = max(smart_max, history_df['time_seconds'].max())
 
@@ -765,7 +857,7 @@ with tab4:
             
             # --- 4. Historical Lines Logic ---
             if runner_history_name:
-                history_df = get_runner_history(con, runner_history_name)
+                history_df = query(get_runner_history, runner_history_name)
                 if not history_df.empty:
                     history_sorted = history_df.sort_values("time_seconds")
                     y_positions = [1.02, 0.92, 0.82] 
@@ -822,4 +914,9 @@ with tab4:
                 fig = style_chart(fig) 
                 st.plotly_chart(fig, use_container_width=True)
         else:
-            st.warning("Not enough data to predict.")
\ No newline at end of file
+            st.warning("Not enough data to predict.")
+
+# Rerun to pick up new finishers written by `athlinks-scraper tail`
+if live_refresh:
+    time.sleep(LIVE_REFRESH_SECONDS)
+    st.rerun()
@@ -1,90 +1,355 @@
+import os
+import re
+import threading
+import time
+
 import duckdb
 import pandas as pd
 
 # Dashboard Queries Module
-def init_db(uploaded_files):
-    """
-    Initializes an in-memory DuckDB connection and loads CSV files.
-    Returns the connection object.
-    """
-    con = duckdb.connect(database=':memory:')
-    
-    # Create a list to hold all dataframes
-    dfs = []
-    
-    import re
 
-    def extract_master_id_from_filename(filename):
-        match = re.search(r'scraped_(\d+)_', filename)
-        if match:
-            return match.group(1)
-        return None
+# Columns of the results table and their types (the scraper's output schema plus Master ID).
+RESULTS_COLUMNS = {
+    "Event ID": "BIGINT", "Event Name": "VARCHAR", "Event Date": "VARCHAR", "Race Type": "VARCHAR",
+    "Name": "VARCHAR", "Gender": "VARCHAR", "Age": "BIGINT", "Bib": "VARCHAR",
+    "City": "VARCHAR", "State": "VARCHAR", "Country": "VARCHAR", "Time": "VARCHAR", "Pace": "VARCHAR",
+    "Overall Rank": "BIGINT", "Gender Rank": "BIGINT", "Division Rank": "BIGINT", "Status": "VARCHAR",
+    "time_ms": "BIGINT", "pace_seconds": "BIGINT", "distance_meters": "BIGINT", "Master ID": "VARCHAR",
+}
+
+# On-disk DuckDB database holding everything under data/, kept in the data directory.
+WAREHOUSE_NAME = "warehouse.duckdb"
+
+# Left in the data directory by a build_warehouse() that found the dashboard
+# holding the warehouse; the dashboard ingests on its next rerun.
+INGEST_REQUEST_NAME = ".ingest_requested"
+
+# Errors opening the warehouse that rebuilding it from data/ fixes. Anything
+# else (a lock held by another process, a full disk) is raised as is.
+REBUILD_ERRORS = ("not a valid DuckDB database file", "Corrupt database file", "version number")
+
+def get_data_dir():
+    return os.path.join(os.path.dirname(__file__), "data")
+
+def get_warehouse_path(data_dir=None):
+    return os.path.join(data_dir or get_data_dir(), WAREHOUSE_NAME)
+
+def extract_master_id_from_filename(filename):
+    # Hive-partitioned datasets carry it in the path (master_id=15776/year=2024/part-*.parquet);
+    # older flat files in the name (scraped_15776_2024.parquet).
+    match = re.search(r'master_id=(\d+)', filename)
+    if match:
+        return match.group(1)
+    match = re.search(r'scraped_(\d+)_', filename)
+    if match:
+        return match.group(1)
+    return None
+
+def _create_results_table(con, name, temp=False):
+    columns = ", ".join(f'"{column}" {kind}' for column, kind in RESULTS_COLUMNS.items())
+    kind = "TEMP TABLE" if temp else "TABLE"
+    # _source records which file each row came from, so files can be reloaded one at a time.
+    con.execute(f"CREATE {kind} IF NOT EXISTS {name} ({columns}, _source VARCHAR)")
+    con.execute(f"CREATE {kind} IF NOT EXISTS _loaded_files (source VARCHAR PRIMARY KEY, stamp VARCHAR)")
+
+def _local_data_files(data_dir):
+    """
+    Returns {relative path: stamp} for the CSV and Parquet files under data_dir,
+    including partition subdirectories. The stamp changes whenever a file is rewritten.
+    """
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(data_dir):
+        # Skip scrape checkpoints and other hidden directories
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in sorted(filenames):
+            if filename.endswith(".parquet") or filename.endswith(".csv"):
+                file_path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                files[os.path.relpath(file_path, data_dir)] = f"{stat.st_mtime_ns}:{stat.st_size}"
+    return files
+
+def _insert_frame(con, table, df, source, master_id):
+    """
+    Appends a DataFrame of results to a results table, keeping only the
+    known columns and casting them to the table's types.
+    """
+    # Ensure column names are consistent/clean
+    df.columns = [c.strip() for c in df.columns]
+    df['Master ID'] = master_id
+    select = ", ".join(
+        f'TRY_CAST("{name}" AS {kind}) AS "{name}"' for name, kind in RESULTS_COLUMNS.items() if name in df.columns
+    )
+    con.register('_incoming', df)
+    try:
+        con.execute(f"INSERT INTO {table} BY NAME SELECT {select}, ? AS _source FROM _incoming", [source])
+    finally:
+        con.unregister('_incoming')
+
+def _sync_sources(con, table, current, load, enriched=None):
+    """
+    Brings `table` in line with `current` ({source: stamp}), loading only
+    sources that are new or whose stamp changed; load(sources) inserts their
+    rows. Rows of sources that changed or disappeared are dropped first.
+    The `enriched` table, if given, is kept in step: the derived rows of
+    exactly those sources are deleted and inserted along with them.
+    Everything is loaded in one go when possible, otherwise source by
+    source so one bad file doesn't hold back the rest.
+    Returns the number of sources loaded.
+    """
+    loaded = dict(con.execute("SELECT source, stamp FROM _loaded_files").fetchall())
+    for source, stamp in loaded.items():
+        if current.get(source) != stamp:
+            con.execute(f"DELETE FROM {table} WHERE _source = ?", [source])
+            if enriched:
+                con.execute(f"DELETE FROM {enriched} WHERE _source = ?", [source])
+            con.execute("DELETE FROM _loaded_files WHERE source = ?", [source])
+
+    todo = [source for source, stamp in current.items() if loaded.get(source) != stamp]
+    if not todo:
+        return 0
+
+    def load_group(sources):
+        con.begin()
+        try:
+            load(sources)
+            if enriched:
+                con.execute(f"INSERT INTO {enriched} BY NAME {_enriched_select(table, 'list_contains(?, _source)')}", [sources])
+            con.executemany("INSERT INTO _loaded_files VALUES (?, ?)", [[source, current[source]] for source in sources])
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+
+    try:
+        load_group(todo)
+        return len(todo)
+    except Exception as e:
+        if len(todo) == 1:
+            print(f"Error loading {todo[0]}: {e}")
+            return 0
 
-    for uploaded_file in uploaded_files:
+    count = 0
+    for source in todo:
         try:
-            df = pd.read_csv(uploaded_file)
-            # Ensure column names are consistent/clean
-            df.columns = [c.strip() for c in df.columns]
-            
-            # Try to get Master ID from filename
-            master_id = extract_master_id_from_filename(uploaded_file.name)
-            if master_id:
-                df['Master ID'] = master_id
-            else:
-                df['Master ID'] = None
-                
-            dfs.append(df)
+            load_group([source])
+            count += 1
         except Exception as e:
-            print(f"Error loading {uploaded_file.name}: {e}")
-
-    # Load local files from data directory
-    import os
-    # Use absolute path relative to this file
-    data_dir = os.path.join(os.path.dirname(__file__), "data")
-    if os.path.exists(data_dir):
-        for filename in os.listdir(data_dir):
-            if filename.endswith(".parquet") or filename.endswith(".csv"):
-                try:
-                    file_path = os.path.join(data_dir, filename)
-                    if filename.endswith(".parquet"):
-                        df = pd.read_parquet(file_path)
-                    else:
-                        df = pd.read_csv(file_path)
-                    
-                    df.columns = [c.strip() for c in df.columns]
-                    
-                    # Try to get Master ID from filename
-                    master_id = extract_master_id_from_filename(filename)
-                    if master_id:
-                        df['Master ID'] = master_id
-                    else:
-                        df['Master ID'] = None
-                        
-                    dfs.append(df)
-                except Exception as e:
-                    print(f"Error loading local file {filename}: {e}")
-            
-    if not dfs:
-        # Create empty DataFrame with expected columns to prevent Catalog Error
-        columns = [
-            "Event ID", "Event Name", "Event Date", "Race Type", "Name", "Gender", "Age", 
-            "Bib", "City", "State", "Country", "Time", "Pace", "Overall Rank", 
-            "Gender Rank", "Division Rank", "Status", "Master ID"
+            print(f"Error loading {source}: {e}")
+    return count
+
+def _scan_files(con, table, data_dir, sources):
+    """
+    Inserts the rows of data files straight from DuckDB's read_parquet /
+    read_csv_auto scans (no pandas copy), keeping only the known columns.
+    Partitioned files take their Master ID from the master_id=... directory
+    via hive_partitioning; flat files from a scraped_<id>_<year> name.
+    """
+    prefix = os.path.join(data_dir, '')
+    groups = {}
+    for source in sources:
+        reader = "read_parquet" if source.endswith(".parquet") else "read_csv_auto"
+        hive = 'master_id=' in source
+        groups.setdefault((reader, hive), []).append(prefix + source)
+
+    for (reader, hive), files in groups.items():
+        # union_by_name lines up files with different column sets; hive partitions
+        # can only be read together with files from the same layout.
+        options = "filename=true, union_by_name=true, hive_partitioning=" + ("true" if hive else "false")
+        if reader == "read_csv_auto":
+            # Read CSV fields as text and cast below; sniffing would turn "20:00" times into TIME values.
+            options += ", all_varchar=true"
+        scan = f"{reader}(?, {options})"
+        columns = {row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {scan}", [files]).fetchall()}
+        select = [
+            f'TRY_CAST("{name}" AS {kind}) AS "{name}"'
+            for name, kind in RESULTS_COLUMNS.items() if name in columns and name != "Master ID"
         ]
-        full_df = pd.DataFrame(columns=columns)
-    else:
-        # Concatenate all dataframes
-        full_df = pd.concat(dfs, ignore_index=True)
-        
-    # Register as a DuckDB table
-    # Register as a DuckDB table
-    con.register('results', full_df)
-    
+        if hive:
+            select.append('CAST(master_id AS VARCHAR) AS "Master ID"')
+        else:
+            master_id = r"NULLIF(regexp_extract(filename, 'scraped_(\d+)_', 1), '')"
+            select.append(f'{master_id} AS "Master ID"')
+        select.append(f"substr(filename, {len(prefix) + 1}) AS _source")
+        con.execute(f"INSERT INTO {table} BY NAME SELECT {', '.join(select)} FROM {scan}", [files])
+
+def _create_warehouse_tables(con):
+    _create_results_table(con, "results")
+    _create_enriched_table(con, "enriched_results", "results")
+    # Bumped per Master ID (and under '*' for any change) by every ingest that changes rows.
+    con.execute("CREATE TABLE IF NOT EXISTS _versions (master_id VARCHAR PRIMARY KEY, version BIGINT)")
+
+def _ingest(con, data_dir):
+    """
+    Loads the new and changed files under data_dir into the warehouse `con`
+    points at, in place, and bumps the versions of the Master IDs whose
+    files changed. Returns the number of files loaded.
+    """
+    current = _local_data_files(data_dir)
+    loaded = dict(con.execute("SELECT source, stamp FROM _loaded_files").fetchall())
+    if loaded == current:
+        return 0
+
+    count = _sync_sources(con, "results", current, lambda sources: _scan_files(con, "results", data_dir, sources),
+                          enriched="enriched_results")
+
+    after = dict(con.execute("SELECT source, stamp FROM _loaded_files").fetchall())
+    changed = {source for source in set(loaded) | set(after) if loaded.get(source) != after.get(source)}
+    if changed:
+        version = con.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM _versions").fetchone()[0]
+        master_ids = {extract_master_id_from_filename(source) for source in changed} - {None}
+        con.executemany("INSERT OR REPLACE INTO _versions VALUES (?, ?)",
+                        [[master_id, version] for master_id in sorted(master_ids | {'*'})])
+    return count
+
+def ingest_requested(data_dir=None):
+    return os.path.exists(os.path.join(data_dir or get_data_dir(), INGEST_REQUEST_NAME))
+
+def _request_ingest(data_dir):
+    with open(os.path.join(data_dir, INGEST_REQUEST_NAME), 'w') as f:
+        f.write(f"{time.time()}\n")
+
+def _clear_ingest_request(data_dir):
+    try:
+        os.remove(os.path.join(data_dir, INGEST_REQUEST_NAME))
+    except FileNotFoundError:
+        pass
+
+def _set_aside(path, error):
+    """
+    Moves an unreadable warehouse (and its WAL) out of the way so it can be
+    rebuilt, keeping it for inspection. Re-raises errors a rebuild won't fix.
+    """
+    if not any(message in str(error) for message in REBUILD_ERRORS):
+        raise error
+    aside = f"{path}.{time.strftime('%Y%m%d-%H%M%S')}.broken"
+    print(f"Rebuilding warehouse {path}, moved the unreadable file to {aside}: {error}")
+    os.replace(path, aside)
+    if os.path.exists(path + ".wal"):
+        os.replace(path + ".wal", aside + ".wal")
+
+# One ingest at a time per process; sessions of the app share its warehouse connection.
+_ingest_lock = threading.Lock()
+
+def build_warehouse(data_dir=None, path=None, con=None):
+    """
+    Ingests the CSV and Parquet files under data_dir into the on-disk
+    warehouse, loading only files that are new or changed since the last
+    build and updating the warehouse in place. A no-op when nothing changed.
+    Only one process can write the warehouse: the dashboard, while it runs.
+    Pass its connection from open_warehouse() as `con` to ingest through it.
+    Otherwise the warehouse is opened here; if the dashboard holds it, an
+    ingest request is left for it instead (see ingest_requested).
+    Returns the number of files loaded.
+    """
+    data_dir = data_dir or get_data_dir()
+    with _ingest_lock:
+        if con is not None:
+            # Cleared first, so files written while this ingest runs are requested again.
+            _clear_ingest_request(data_dir)
+            cursor = con.cursor()
+            cursor.execute("USE warehouse")
+            return _ingest(cursor, data_dir)
+
+        path = path or get_warehouse_path(data_dir)
+        os.makedirs(data_dir, exist_ok=True)
+        try:
+            con = duckdb.connect(path)
+        except duckdb.IOException as e:
+            if "Could not set lock" in str(e):
+                _request_ingest(data_dir)
+                print(f"Warehouse {path} is held by the dashboard; it will ingest the new files on its next rerun.")
+                return 0
+            _set_aside(path, e)
+            con = duckdb.connect(path)
+        with con:
+            _clear_ingest_request(data_dir)
+            _create_warehouse_tables(con)
+            return _ingest(con, data_dir)
+
+def open_warehouse(path=None):
+    """
+    Opens an in-memory DuckDB connection with the warehouse attached as
+    `warehouse`, creating and building it first if it doesn't exist yet.
+    The app keeps one for its lifetime: sessions query through cursors of
+    it (see init_db) and build_warehouse(con=...) ingests through it.
+    An unreadable warehouse is set aside and rebuilt.
+    """
+    path = path or get_warehouse_path()
+    exists = os.path.exists(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    con = duckdb.connect(database=':memory:')
+    escaped = path.replace("'", "''")
+    try:
+        con.execute(f"ATTACH '{escaped}' AS warehouse")
+    except duckdb.IOException as e:
+        _set_aside(path, e)
+        exists = False
+        con.execute(f"ATTACH '{escaped}' AS warehouse")
+    cursor = con.cursor()
+    cursor.execute("USE warehouse")
+    _create_warehouse_tables(cursor)
+    if not exists:
+        build_warehouse(os.path.dirname(path), path, con)
+    return con
+
+def get_data_version(con, master_id=None):
+    """
+    Returns a string that changes whenever the rows of master_id (of any
+    race when None) change in the warehouse or in this session's uploads,
+    for keying caches of query results.
+    """
+    version = con.execute("SELECT MAX(version) FROM warehouse._versions WHERE master_id = ?",
+                          [str(master_id) if master_id else '*']).fetchone()[0]
+    uploads = con.execute("SELECT string_agg(source || ':' || stamp, ',' ORDER BY source) FROM _loaded_files").fetchone()[0]
+    return f"{version}|{uploads or ''}"
+
+def init_db(uploaded_files, con=None):
+    """
+    Returns a cursor over the warehouse (of `con` from open_warehouse(), or
+    a new one) with the uploaded CSV files loaded next to it in temporary
+    tables. The results and enriched_results views cover both. Temporary
+    objects belong to the cursor, so each session keeps its own uploads.
+    """
+    con = (con or open_warehouse()).cursor()
+    _create_results_table(con, "uploads", temp=True)
+    _create_enriched_table(con, "uploads_enriched", "uploads", temp=True)
+    con.execute("""
+        CREATE TEMP VIEW results AS
+        SELECT * FROM warehouse.results
+        UNION ALL BY NAME
+        SELECT * FROM uploads
+    """)
+    con.execute("""
+        CREATE TEMP VIEW enriched_results AS
+        SELECT * FROM warehouse.enriched_results
+        UNION ALL BY NAME
+        SELECT * FROM uploads_enriched
+    """)
+    refresh_db(con, uploaded_files)
     return con
 
+def refresh_db(con, uploaded_files=()):
+    """
+    Loads uploaded files that are new or changed since the last call,
+    dropping those that were removed. Cheap when nothing changed, so it can
+    run on every rerun. Returns the number of uploaded files loaded.
+    """
+    uploads = {f"upload:{f.name}": f for f in uploaded_files or ()}
+    current = {source: str(getattr(f, 'size', '')) for source, f in uploads.items()}
+
+    def load(sources):
+        for source in sources:
+            uploads[source].seek(0)
+            df = pd.read_csv(uploads[source])
+            _insert_frame(con, "uploads", df, source, extract_master_id_from_filename(uploads[source].name))
+
+    return _sync_sources(con, "uploads", current, load, enriched="uploads_enriched")
+
 
 import json
-import os
 
 def get_metadata_path():
     return os.path.join(os.path.dirname(__file__), "data", "event_metadata.json")
@@ -140,110 +405,168 @@ def get_event_names(con):
         print(f"Error getting event names: {e}")
         return []
 
-def create_enriched_view(con, selected_master_id=None):
+def _seconds_from_clock(column):
     """
-    Creates or replaces the results_enriched view.
-    If selected_master_id is provided, filters data to that Master ID.
+    SQL expression parsing a "MM:SS" or "HH:MM:SS" string column into seconds.
     """
-    
-    # Base filter conditions
-    where_clause = """
-        "Pace" IS NOT NULL AND "Pace" != ''
-        AND "Time" IS NOT NULL
-        
-        -- Filter out anyone faster than 12:00 (720 seconds).
-        AND (
+    return f"""
             CASE 
-                WHEN "Time" LIKE '%:%:%' THEN 
-                    TRY_CAST(SPLIT_PART("Time", ':', 1) AS INTEGER) * 3600 + 
-                    TRY_CAST(SPLIT_PART("Time", ':', 2) AS INTEGER) * 60 + 
-                    TRY_CAST(SPLIT_PART("Time", ':', 3) AS INTEGER)
+                WHEN "{column}" LIKE '%:%:%' THEN 
+                    TRY_CAST(SPLIT_PART("{column}", ':', 1) AS INTEGER) * 3600 + 
+                    TRY_CAST(SPLIT_PART("{column}", ':', 2) AS INTEGER) * 60 + 
+                    TRY_CAST(SPLIT_PART("{column}", ':', 3) AS INTEGER)
                 ELSE 
-                    TRY_CAST(SPLIT_PART("Time", ':', 1) AS INTEGER) * 60 + 
-                    TRY_CAST(SPLIT_PART("Time", ':', 2) AS INTEGER)
-            END
-        ) > 720
-        -- Exclude DNF (Did Not Finish)
-        AND ("Status" IS NULL OR "Status" != 'DNF')
+                    TRY_CAST(SPLIT_PART("{column}", ':', 1) AS INTEGER) * 60 + 
+                    TRY_CAST(SPLIT_PART("{column}", ':', 2) AS INTEGER)
+            END"""
+
+def _enriched_select(table, where=None):
+    """
+    SELECT deriving the analytics rows of a results table: time and pace in
+    seconds (the scraper's typed time_ms / pace_seconds when present, else
+    parsed from the Time / Pace strings), the event year, normalized names
+    and race types. Non-finishers and implausible times are filtered out.
+    Rows come out sorted by Master ID, so filters on it skip row groups.
+    _source is kept so the rows of one file can be replaced on their own;
+    `where` restricts the rows read from `table` (e.g. to some sources).
+    """
+    return f"""
+        SELECT * FROM (
+            SELECT * REPLACE (
+                    CAST(COALESCE("pace_seconds", {_seconds_from_clock("Pace")}) AS INTEGER) AS pace_seconds
+                 ),
+
+                 -- Time in seconds
+                 CAST(COALESCE("time_ms" // 1000, {_seconds_from_clock("Time")}) AS INTEGER) as time_seconds,
+
+                 CAST(YEAR(TRY_CAST("Event Date" AS DATE)) AS INTEGER) as event_year,
+
+                 -- Normalize Name
+                 CASE 
+                    WHEN TRIM(UPPER("Name")) = 'NESBITT DREW' THEN 'DREW NESBITT'
+                    ELSE TRIM(UPPER("Name"))
+                 END as "Name_Normalized",
+
+                 -- Normalize Race Type (Catch variations of 5k and 5 Mile)
+                 CASE 
+                    WHEN REGEXP_MATCHES("Race Type", '(?i)^(run[- ]?)?5k([- ]?run)?$') THEN '5K'
+                    WHEN REGEXP_MATCHES("Race Type", '(?i)^(run[- ]?)?5[- ]?mil(e|er)([- ]?run)?$') THEN '5 Mile'
+                    ELSE "Race Type"
+                 END as "Race Type Normalized"
+
+            FROM {table}
+            {f"WHERE {where}" if where else ""}
+        )
+        WHERE "Pace" IS NOT NULL AND "Pace" != ''
+            AND "Time" IS NOT NULL
+            -- Filter out anyone faster than 12:00 (720 seconds).
+            AND time_seconds > 720
+            -- Exclude DNF (Did Not Finish)
+            AND ("Status" IS NULL OR "Status" != 'DNF')
+        ORDER BY "Master ID", event_year
+    """
+
+def _has_enriched_table(con, table, temp=False):
+    database = "temp" if temp else con.execute("SELECT current_database()").fetchone()[0]
+    return con.execute(
+        "SELECT count(*) FROM duckdb_columns() WHERE database_name = ? AND table_name = ? AND column_name = '_source'",
+        [database, table]
+    ).fetchone()[0] > 0
+
+def _create_enriched_table(con, table, source, temp=False):
+    """
+    Creates the table of derived rows for the results table `source`, with
+    its Master ID index. It is built in full only when it is missing (or
+    predates the _source column); after that _sync_sources maintains it.
+    """
+    if not _has_enriched_table(con, table, temp):
+        kind = "TEMP TABLE" if temp else "TABLE"
+        con.execute(f"CREATE OR REPLACE {kind} {table} AS {_enriched_select(source)}")
+    con.execute(f'CREATE INDEX IF NOT EXISTS {table}_master_id ON {table} ("Master ID")')
+
+def create_enriched_view(con, selected_master_id=None):
     """
-    
-    # Add Master ID Filter if selected
-    if selected_master_id:
-        where_clause += f" AND \"Master ID\" = '{selected_master_id}'"
-
-    query = f"""
-        CREATE OR REPLACE VIEW results_enriched AS
-        SELECT *,
-             -- 1. Parse Pace to Seconds
-             CASE 
-                WHEN "Pace" LIKE '%:%:%' THEN 
-                    TRY_CAST(SPLIT_PART("Pace", ':', 1) AS INTEGER) * 3600 + 
-                    TRY_CAST(SPLIT_PART("Pace", ':', 2) AS INTEGER) * 60 + 
-                    TRY_CAST(SPLIT_PART("Pace", ':', 3) AS INTEGER)
-                ELSE 
-                    TRY_CAST(SPLIT_PART("Pace", ':', 1) AS INTEGER) * 60 + 
-                    TRY_CAST(SPLIT_PART("Pace", ':', 2) AS INTEGER)
-             END as pace_seconds,
-
-             -- 2. Parse Time to Seconds
-             CASE 
-                WHEN "Time" LIKE '%:%:%' THEN 
-                    TRY_CAST(SPLIT_PART("Time", ':', 1) AS INTEGER) * 3600 + 
-                    TRY_CAST(SPLIT_PART("Time", ':', 2) AS INTEGER) * 60 + 
-                    TRY_CAST(SPLIT_PART("Time", ':', 3) AS INTEGER)
-                ELSE 
-                    TRY_CAST(SPLIT_PART("Time", ':', 1) AS INTEGER) * 60 + 
-                    TRY_CAST(SPLIT_PART("Time", ':', 2) AS INTEGER)
-             END as time_seconds,
-             
-             YEAR(CAST("Event Date" AS DATE)) as event_year,
-             
-             -- 3. Normalize Name
-             CASE 
-                WHEN TRIM(UPPER("Name")) = 'NESBITT DREW' THEN 'DREW NESBITT'
-                ELSE TRIM(UPPER("Name"))
-             END as "Name_Normalized",
-
-             -- 4. Normalize Race Type (Catch variations of 5k and 5 Mile)
-             CASE 
-                WHEN REGEXP_MATCHES("Race Type", '(?i)^(run[- ]?)?5k([- ]?run)?$') THEN '5K'
-                WHEN REGEXP_MATCHES("Race Type", '(?i)^(run[- ]?)?5[- ]?mil(e|er)([- ]?run)?$') THEN '5 Mile'
-                ELSE "Race Type"
-             END as "Race Type Normalized"
-
-        FROM results
-        WHERE {where_clause}
+    Creates or replaces the results_enriched view over the enriched_results
+    table, which is kept up to date at ingest. Selecting a race is just a
+    filter on Master ID. It is a temporary view, so cursors of a shared
+    connection each keep their own selection.
     """
-    
+    query = "CREATE OR REPLACE TEMP VIEW results_enriched AS SELECT * EXCLUDE (_source) FROM enriched_results"
+    if selected_master_id:
+        escaped = str(selected_master_id).replace("'", "''")
+        query += f" WHERE \"Master ID\" = '{escaped}'"
     con.execute(query)
 
-def get_overview_stats(con):
+class RaceContext:
+    """
+    Facts about the selected race that most queries need, resolved once per
+    selection with a single scan of results_enriched (see get_race_context).
+    primary_race is the most common normalized race type; the *_rows and
+    years fields count rows and distinct years over all race types and over
+    the primary race only.
+    """
+
+    def __init__(self, master_id=None, primary_race=None, total_rows=0, primary_rows=0,
+                 min_year=None, max_year=None, years=(), primary_years=()):
+        self.master_id = master_id
+        self.primary_race = primary_race
+        self.total_rows = total_rows
+        self.primary_rows = primary_rows
+        self.min_year = min_year
+        self.max_year = max_year
+        self.years = list(years)
+        self.primary_years = list(primary_years)
+
+def get_race_context(con, selected_master_id=None):
+    """
+    Resolves the RaceContext of the current results_enriched view.
+    """
+    try:
+        rows = con.execute("""
+            SELECT "Race Type Normalized", COUNT(*), LIST(DISTINCT event_year ORDER BY event_year)
+            FROM results_enriched
+            GROUP BY "Race Type Normalized"
+            ORDER BY COUNT(*) DESC
+        """).fetchall()
+    except Exception as e:
+        print(f"Error resolving race context: {e}")
+        return RaceContext(selected_master_id)
+    if not rows:
+        return RaceContext(selected_master_id)
+
+    primary_race, primary_rows, primary_years = rows[0]
+    years = sorted({year for _, _, race_years in rows for year in race_years if year is not None})
+    return RaceContext(
+        master_id=selected_master_id,
+        primary_race=primary_race,
+        total_rows=sum(count for _, count, _ in rows),
+        primary_rows=primary_rows,
+        min_year=years[0] if years else None,
+        max_year=years[-1] if years else None,
+        years=years,
+        primary_years=[year for year in primary_years if year is not None],
+    )
+
+def get_overview_stats(con, race):
     """
     Returns basic stats: Total Runners, Avg Time, Fastest Time, and Fastest Runner Name.
     """
     try:
         query = """
-            WITH primary_race AS (
-                SELECT "Race Type Normalized" 
-                FROM results_enriched 
-                GROUP BY "Race Type Normalized" 
-                ORDER BY COUNT(*) DESC 
-                LIMIT 1
-            )
             SELECT 
                 COUNT(*) as total_runners,
                 AVG(pace_seconds) as avg_pace_seconds,
-                (SELECT "Time" FROM results_enriched WHERE "Race Type Normalized" = (SELECT * FROM primary_race) ORDER BY time_seconds ASC LIMIT 1) as fastest_time,
-                (SELECT "Name" FROM results_enriched WHERE "Race Type Normalized" = (SELECT * FROM primary_race) ORDER BY time_seconds ASC LIMIT 1) as fastest_runner,
-                (SELECT "Time" FROM results_enriched WHERE "Race Type Normalized" = (SELECT * FROM primary_race) ORDER BY time_seconds DESC LIMIT 1) as slowest_time
+                ARG_MIN("Time", time_seconds) as fastest_time,
+                ARG_MIN("Name", time_seconds) as fastest_runner,
+                ARG_MAX("Time", time_seconds) as slowest_time
             FROM results_enriched
-            WHERE "Race Type Normalized" = (SELECT * FROM primary_race)
+            WHERE "Race Type Normalized" = ?
         """
-        return con.execute(query).df()
+        return con.execute(query, [race.primary_race]).df()
     except Exception:
         return pd.DataFrame()
 
-def get_pace_partners(con, target_str, tolerance_seconds=10, search_type="Pace"):
+def get_pace_partners(con, race, target_str, tolerance_seconds=10, search_type="Pace"):
     """
     Finds runners who finish near the target pace or time.
     target_str: "MM:SS" or "HH:MM:SS"
@@ -268,13 +591,10 @@ def get_pace_partners(con, target_str, tolerance_seconds=10, search_type="Pace")
         min_sec = target_seconds - tolerance_seconds
         max_sec = target_seconds + tolerance_seconds
         
-        # Get max year to filter for last 2 years
-        max_year_res = con.execute("SELECT MAX(event_year) FROM results_enriched").fetchone()
-        max_year = max_year_res[0] if max_year_res else None
-        
+        # Filter for last 2 years
         year_clause = ""
-        if max_year:
-            cutoff_year = max_year - 1
+        if race.max_year:
+            cutoff_year = race.max_year - 1
             year_clause = f"AND event_year >= {cutoff_year}"
         
         column_to_filter = "pace_seconds" if search_type == "Pace" else "time_seconds"
@@ -292,7 +612,7 @@ def get_pace_partners(con, target_str, tolerance_seconds=10, search_type="Pace")
         print(f"Error finding pace partners: {e}")
         return pd.DataFrame()
 
-def get_fun_stats(con):
+def get_fun_stats(con, race):
     """
     Returns some fun stats like most frequent runners.
     """
@@ -312,7 +632,7 @@ def get_fun_stats(con):
     except Exception:
         return pd.DataFrame()
 
-def get_distribution(con):
+def get_distribution(con, race):
     """
     Returns data for pace distribution histogram.
     """
@@ -325,7 +645,7 @@ def get_distribution(con):
     except Exception:
         return pd.DataFrame()
 
-def get_trends(con):
+def get_trends(con, race):
     """
     Aggregates stats by Year.
     """
@@ -342,15 +662,15 @@ def get_trends(con):
                 MEDIAN(time_seconds) as median_time_seconds
             FROM results_enriched
             WHERE event_year IS NOT NULL 
-              AND "Race Type Normalized" = (SELECT "Race Type Normalized" FROM results_enriched GROUP BY "Race Type Normalized" ORDER BY COUNT(*) DESC LIMIT 1)
+              AND "Race Type Normalized" = ?
             GROUP BY event_year
             ORDER BY event_year
-        """).df()
+        """, [race.primary_race]).df()
     except Exception as e:
         print(f"Error getting trends: {e}")
         return pd.DataFrame()
 
-def get_runner_history(con, name_query):
+def get_runner_history(con, race, name_query):
     """
     Finds history for a specific runner.
     """
@@ -368,7 +688,7 @@ def get_runner_history(con, name_query):
         print(f"Error getting runner history: {e}")
         return pd.DataFrame()
 
-def get_nemesis(con, runner_name):
+def get_nemesis(con, race, runner_name):
     """
     Finds rivals who have raced against the target runner multiple times.
     """
@@ -400,14 +720,12 @@ def get_nemesis(con, runner_name):
         print(f"Error finding nemesis: {e}")
         return pd.DataFrame()
 
-def get_retention_data(con):
+def get_retention_data(con, race):
     """
     Calculates retention flow between years for Sankey diagram.
     """
     try:
-        # Get all years
-        years_df = con.execute("SELECT DISTINCT event_year FROM results_enriched ORDER BY event_year").df()
-        years = years_df['event_year'].tolist()
+        years = race.years
         
         if len(years) < 2:
             return []
@@ -461,16 +779,13 @@ def get_retention_data(con):
         print(f"Error getting retention data: {e}")
         return []
 
-def get_fastest_by_year(con):
+def get_fastest_by_year(con, race):
     """
     Returns the fastest runner for each year (5K only).
     """
     try:
         query = """
-            WITH primary_race AS (
-                SELECT "Race Type Normalized" FROM results_enriched GROUP BY "Race Type Normalized" ORDER BY COUNT(*) DESC LIMIT 1
-            ),
-            ranked AS (
+            WITH ranked AS (
                 SELECT 
                     event_year,
                     "Name",
@@ -480,25 +795,22 @@ def get_fastest_by_year(con):
                     "Gender",
                     ROW_NUMBER() OVER (PARTITION BY event_year ORDER BY time_seconds ASC) as rn
                 FROM results_enriched
-                WHERE "Race Type Normalized" = (SELECT * FROM primary_race)
+                WHERE "Race Type Normalized" = ?
             )
             SELECT * FROM ranked WHERE rn = 1 ORDER BY event_year DESC
         """
-        return con.execute(query).df()
+        return con.execute(query, [race.primary_race]).df()
     except Exception as e:
         print(f"Error getting fastest by year: {e}")
         return pd.DataFrame()
 
-def get_fastest_by_demographics(con):
+def get_fastest_by_demographics(con, race):
     """
     Returns fastest time by Gender and Age Group (5K only).
     """
     try:
         query = """
-            WITH primary_race AS (
-                SELECT "Race Type Normalized" FROM results_enriched GROUP BY "Race Type Normalized" ORDER BY COUNT(*) DESC LIMIT 1
-            ),
-            age_grouped AS (
+            WITH age_grouped AS (
                 SELECT *,
                     CASE 
                         WHEN "Age" < 15 THEN '0-14'
@@ -512,7 +824,7 @@ def get_fastest_by_demographics(con):
                         ELSE 'Unknown'
                     END as Age_Group
                 FROM results_enriched
-                WHERE "Race Type Normalized" = (SELECT * FROM primary_race) AND "Age" IS NOT NULL
+                WHERE "Race Type Normalized" = ? AND "Age" IS NOT NULL
             ),
             ranked AS (
                 SELECT 
@@ -527,21 +839,18 @@ def get_fastest_by_demographics(con):
             )
             SELECT * FROM ranked WHERE rn = 1 ORDER BY "Gender", Age_Group
         """
-        return con.execute(query).df()
+        return con.execute(query, [race.primary_race]).df()
     except Exception as e:
         print(f"Error getting fastest by demographics: {e}")
         return pd.DataFrame()
 
-def get_division_stats(con):
+def get_division_stats(con, race):
     """
     Analyzes competitiveness of age divisions (5K only).
     """
     try:
         query = """
-            WITH primary_race AS (
-                SELECT "Race Type Normalized" FROM results_enriched GROUP BY "Race Type Normalized" ORDER BY COUNT(*) DESC LIMIT 1
-            ),
-            age_grouped AS (
+            WITH age_grouped AS (
                 SELECT *,
                     CASE 
                         WHEN "Age" < 15 THEN '0-14'
@@ -555,7 +864,7 @@ def get_division_stats(con):
                         ELSE 'Unknown'
                     END as Age_Group
                 FROM results_enriched
-                WHERE "Race Type Normalized" = (SELECT * FROM primary_race) AND "Age" IS NOT NULL
+                WHERE "Race Type Normalized" = ? AND "Age" IS NOT NULL
             ),
             div_stats AS (
                 SELECT 
@@ -581,54 +890,48 @@ def get_division_stats(con):
             )
             SELECT * FROM div_stats ORDER BY runner_count DESC
         """
-        return con.execute(query).df()
+        return con.execute(query, [race.primary_race]).df()
     except Exception as e:
         print(f"Error getting division stats: {e}")
         return pd.DataFrame()
 
-def get_era_stats(con):
+def get_era_stats(con, race):
     """
     Compares performance between 5-year eras (e.g., 2010-2014, 2015-2019) (5K only).
     """
     try:
         query = """
-            WITH primary_race AS (
-                SELECT "Race Type Normalized" FROM results_enriched GROUP BY "Race Type Normalized" ORDER BY COUNT(*) DESC LIMIT 1
-            )
             SELECT 
                 CAST(FLOOR(event_year / 5) * 5 AS INTEGER) as Era_Start,
                 COUNT(*) / COUNT(DISTINCT event_year) as avg_runners_per_year,
                 AVG(pace_seconds) as avg_pace_seconds,
                 MIN(time_seconds) as fastest_time_seconds
             FROM results_enriched
-            WHERE "Race Type Normalized" = (SELECT * FROM primary_race)
+            WHERE "Race Type Normalized" = ?
             GROUP BY Era_Start
             ORDER BY Era_Start
         """
-        return con.execute(query).df()
+        return con.execute(query, [race.primary_race]).df()
     except Exception as e:
         print(f"Error getting era stats: {e}")
         return pd.DataFrame()
 
-def get_raw_times(con):
+def get_raw_times(con, race):
     """
     Returns all finish times in seconds for 5K races.
     """
     try:
         query = """
-            WITH primary_race AS (
-                SELECT "Race Type Normalized" FROM results_enriched GROUP BY "Race Type Normalized" ORDER BY COUNT(*) DESC LIMIT 1
-            )
             SELECT time_seconds, "Gender", "Age", event_year
             FROM results_enriched
-            WHERE "Race Type Normalized" = (SELECT * FROM primary_race) AND time_seconds IS NOT NULL
+            WHERE "Race Type Normalized" = ? AND time_seconds IS NOT NULL
         """
-        return con.execute(query).df()
+        return con.execute(query, [race.primary_race]).df()
     except Exception as e:
         print(f"Error getting raw times: {e}")
         return pd.DataFrame()
 
-def get_competitiveness_stats(con, gender="All", age_min=0, age_max=100):
+def get_competitiveness_stats(con, race, gender="All", age_min=0, age_max=100):
     """
     Returns the 3rd and 10th place times by year, filtered by demographics.
     """
@@ -645,16 +948,13 @@ def get_competitiveness_stats(con, gender="All", age_min=0, age_max=100):
             where_clause = "AND " + where_clause
 
         query = f"""
-            WITH primary_race AS (
-                SELECT "Race Type Normalized" FROM results_enriched GROUP BY "Race Type Normalized" ORDER BY COUNT(*) DESC LIMIT 1
-            ),
-            ranked AS (
+            WITH ranked AS (
                 SELECT 
                     event_year,
                     time_seconds,
                     ROW_NUMBER() OVER (PARTITION BY event_year ORDER BY time_seconds ASC) as rn
                 FROM results_enriched
-                WHERE "Race Type Normalized" = (SELECT * FROM primary_race)
+                WHERE "Race Type Normalized" = ?
                   {where_clause}
             )
             SELECT 
@@ -666,26 +966,15 @@ def get_competitiveness_stats(con, gender="All", age_min=0, age_max=100):
             GROUP BY event_year
             ORDER BY event_year
         """
-        return con.execute(query).df()
+        return con.execute(query, [race.primary_race]).df()
     except Exception as e:
         print(f"Error getting competitiveness stats: {e}")
         return pd.DataFrame()
 
-def get_avg_annual_runners(con):
+def get_avg_annual_runners(con, race):
     """
     Returns the average number of runners per year (5K only).
     """
-    try:
-        query = """
-            WITH primary_race AS (
-                SELECT "Race Type Normalized" FROM results_enriched GROUP BY "Race Type Normalized" ORDER BY COUNT(*) DESC LIMIT 1
-            )
-            SELECT COUNT(*) * 1.0 / COUNT(DISTINCT event_year) as avg_runners
-            FROM results_enriched
-            WHERE "Race Type Normalized" = (SELECT * FROM primary_race)
-        """
-        result = con.execute(query).fetchone()
-        return result[0] if result else 0
-    except Exception as e:
-        print(f"Error getting avg annual runners: {e}")
+    if not race.primary_years:
         return 0
+    return race.primary_rows * 1.0 / len(race.primary_years)
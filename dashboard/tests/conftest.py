@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The dashboard modules are plain scripts next to app.py, not a package.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+
+import duckdb
+import pandas as pd
+
+import dashboard_queries
+from dashboard_queries import build_warehouse, get_warehouse_path, ingest_requested, open_warehouse
+
+def _write_year(data_dir, master_id, year, finishers, name=None):
+    path = os.path.join(data_dir, f"master_id={master_id}", f"year={year}", name or f"part-{master_id}{year}.parquet")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.DataFrame([{
+        "Event ID": master_id * 100 + year % 100, "Event Name": f"Race {master_id}", "Event Date": f"{year}-11-27",
+        "Race Type": "5K", "Name": f"Runner {i}", "Bib": str(i), "Time": f"{20 + i % 10}:{i % 60:02d}",
+        "Pace": "6:30", "Overall Rank": i + 1,
+    } for i in range(finishers)]).to_parquet(path)
+    return path
+
+def _counts(data_dir):
+    with duckdb.connect(get_warehouse_path(data_dir), read_only=True) as con:
+        results = dict(con.execute('SELECT "Master ID", count(*) FROM results GROUP BY ALL').fetchall())
+        enriched = con.execute('SELECT * EXCLUDE (_source) FROM enriched_results ORDER BY _source, "Overall Rank"').df()
+        derived = con.execute(f'SELECT * EXCLUDE (_source) FROM ({dashboard_queries._enriched_select("results")}) '
+                              f'ORDER BY _source, "Overall Rank"').df()
+        versions = dict(con.execute("SELECT master_id, version FROM _versions").fetchall())
+    # enriched_results, maintained file by file, matches deriving it from scratch.
+    assert enriched.equals(derived)
+    return results, versions
+
+def test_ingest_loads_only_new_and_changed_files(tmp_path):
+    data_dir = str(tmp_path)
+    _write_year(data_dir, 1, 2023, 40)
+    _write_year(data_dir, 2, 2023, 30)
+    assert build_warehouse(data_dir) == 2
+    results, versions = _counts(data_dir)
+    assert results == {"1": 40, "2": 30}
+
+    # Nothing changed: nothing loaded, no version bumped.
+    assert build_warehouse(data_dir) == 0
+    assert _counts(data_dir)[1] == versions
+
+    # A tail segment for race 2 loads on its own and leaves race 1's version alone.
+    _write_year(data_dir, 2, 2023, 5, name="part-22023-000000030.parquet")
+    assert build_warehouse(data_dir) == 1
+    results, new_versions = _counts(data_dir)
+    assert results == {"1": 40, "2": 35}
+    assert new_versions["1"] == versions["1"] and new_versions["2"] > versions["2"]
+
+    # A rewritten file replaces its rows; a deleted one takes them along.
+    _write_year(data_dir, 1, 2023, 45)
+    os.remove(_write_year(data_dir, 2, 2023, 1))
+    assert build_warehouse(data_dir) == 1
+    assert _counts(data_dir)[0] == {"1": 45, "2": 5}
+
+def test_unreadable_warehouse_is_set_aside_and_rebuilt(tmp_path):
+    data_dir = str(tmp_path)
+    _write_year(data_dir, 1, 2023, 40)
+    path = get_warehouse_path(data_dir)
+    with open(path, 'wb') as f:
+        f.write(b"not a database")
+
+    assert build_warehouse(data_dir) == 1
+    assert _counts(data_dir)[0] == {"1": 40}
+    broken = [name for name in os.listdir(data_dir) if name.endswith(".broken")]
+    assert len(broken) == 1
+    with open(os.path.join(data_dir, broken[0]), 'rb') as f:
+        assert f.read() == b"not a database"
+
+def test_ingest_is_requested_while_the_dashboard_holds_the_warehouse(tmp_path):
+    data_dir = str(tmp_path)
+    _write_year(data_dir, 1, 2023, 40)
+    path = get_warehouse_path(data_dir)
+    # Another process (the dashboard) holds the warehouse open.
+    holder = subprocess.Popen([sys.executable, "-c", "import duckdb, sys; con = duckdb.connect(sys.argv[1]); "
+                               "print('open', flush=True); sys.stdin.read()", path],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "open"
+        _write_year(data_dir, 2, 2023, 30)
+        assert build_warehouse(data_dir) == 0
+        assert ingest_requested(data_dir)
+    finally:
+        holder.communicate("")
+
+    # The dashboard picks the request up and ingests through its own connection.
+    con = open_warehouse(path)
+    assert build_warehouse(data_dir, con=con) == 2
+    assert not ingest_requested(data_dir)
+    con.close()
+    assert _counts(data_dir)[0] == {"1": 40, "2": 30}
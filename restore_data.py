@@ -1,32 +1,72 @@
+import argparse
 import os
-import pandas as pd
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), "athlinks_scraper_project"))
-from athlinks_scraper.core import fetch_master_events, get_results
+from athlinks_scraper.core import fetch_metadata, configure_client
+from athlinks_scraper.catalog import EventCatalog, load_master_events, plan_largest_first
+from athlinks_scraper.cache import ResponseCache
+from athlinks_scraper.jobs import run_events
+from athlinks_scraper.manifest import ScrapeManifest
+from athlinks_scraper.checkpoint import ScrapeCheckpoint
+from athlinks_scraper.writers import migrate_flat_files, partition_path, write_event
+sys.path.append(os.path.join(os.path.dirname(__file__), "dashboard"))
+from dashboard_queries import build_warehouse, ingest_requested
 
-master_id = "15776" # Branford Turkey Trot
-print(f"Restoring data for Master ID: {master_id}")
+parser = argparse.ArgumentParser(description="Re-scrape every year of a master event into dashboard/data.")
+parser.add_argument("--master-id", default="15776", help="Master Event ID (default: Branford Turkey Trot).")
+parser.add_argument("--jobs", "-j", type=int, default=4, help="Number of years to scrape concurrently.")
+parser.add_argument("--force", action="store_true", help="Re-scrape every year, even ones already saved and final.")
+parser.add_argument("--resume", action="store_true", help="Continue interrupted years from their checkpoints.")
+parser.add_argument("--offline", action="store_true", help="Rebuild from cached API responses only.")
+args = parser.parse_args()
 
-events = fetch_master_events(master_id)
-print(f"Found {len(events)} events.")
+configure_client(cache=ResponseCache(offline=args.offline))
+
+master_id = args.master_id
+print(f"Restoring data for Master ID: {master_id}")
 
 data_dir = "dashboard/data"
 os.makedirs(data_dir, exist_ok=True)
+checkpoint_dir = os.path.join(data_dir, ".checkpoints")
+
+manifest = ScrapeManifest.for_directory(data_dir)
+# Years saved by older versions as flat scraped_<id>_<year>.parquet files move into
+# the partitions, so they aren't scraped again and ingested twice.
+migrate_flat_files(data_dir, manifest)
+events = load_master_events(master_id, catalog=EventCatalog.for_directory(data_dir), manifest=manifest)
+print(f"Found {len(events)} events.")
 
-for i, event in enumerate(events):
+if not args.force:
+    events = [e for e in events if manifest.needs_scrape(e['id'])]
+    print(f"{len(events)} events missing or still changing.")
+events = plan_largest_first(events)
+
+def scrape(event):
     year = event['date_str'][:4]
     event_id = event['id']
     print(f"Scraping {year} (Event ID: {event_id})...")
-    
-    try:
-        df = get_results(event_id)
-        if not df.empty:
-            filename = os.path.join(data_dir, f"scraped_{master_id}_{year}.parquet")
-            df.to_parquet(filename, index=False)
-            print(f"Saved {filename}")
-        else:
-            print(f"No results for {year}")
-    except Exception as e:
-        print(f"Error scraping {year}: {e}")
 
+    filename = partition_path(data_dir, master_id, event['date_str'], event_id)
+    checkpoint = ScrapeCheckpoint(checkpoint_dir, event_id)
+    metadata = event.get('metadata') or fetch_metadata(event_id)
+    rows = write_event(event_id, filename, "parquet", metadata, checkpoint=checkpoint, resume=args.resume,
+                       expected_pages=event.get('expected_pages'))
+    if rows == 0:
+        print(f"No results for {year}")
+        return 0
+
+    manifest.record(event_id, filename, rows, event_date=event['date_str'], master_id=master_id)
+    print(f"Saved {filename}")
+    return rows
+
+def on_done(event, rows, error):
+    if error is not None:
+        print(f"Error scraping {event['date_str'][:4]}: {error}")
+
+report = run_events(events, scrape, jobs=args.jobs, on_done=on_done)
+print(report.summary())
+
+loaded = build_warehouse(data_dir)
+if not ingest_requested(data_dir):
+    print(f"Loaded {loaded} new or changed files into {os.path.join(data_dir, 'warehouse.duckdb')}.")
 print("Restoration complete.")